@@ -0,0 +1,192 @@
+"""
+AFD sobre bytes: simula la tabla del AFDmin junto con el tokenizador trie
+directamente sobre la codificación UTF-8 de la entrada.
+
+La construcción tiene dos pasos:
+1. Producto por carácter: cada estado es el estado de la tabla más el
+   estado del tokenizador (fuera de una corrida de letras, dentro de una
+   que todavía puede ser palabra, o dentro de una que ya se parte por
+   carácter). Así las palabras multicaracter (if, else, ...) quedan
+   resueltas sin tokenizar.
+2. Bajada a bytes: cada transición por un carácter se reemplaza por la
+   secuencia de bytes de su UTF-8 (con estados intermedios compartidos
+   por prefijo). Cualquier otro byte, incluido UTF-8 inválido, lleva al
+   estado muerto.
+
+Los 256 bytes se agrupan en clases (bytes con la misma columna en toda la
+tabla) y las transiciones van en un array('i') plano de ancho fijo. Los
+estados se guardan ya multiplicados por el ancho, así que avanzar es
+transiciones[estado + clases[byte]].
+
+coincide acepta bytes, bytearray, memoryview, mmap o cualquier objeto
+con el protocolo de buffer; se recorre con un memoryview, sin decodificar
+ni copiar.
+"""
+
+from array import array
+from collections import deque
+
+from lexer.trie import _FIN
+
+_FUERA, _VIVA, _MUERTA = 0, 1, 2  # estado del tokenizador
+
+
+class AFDBytes:
+    def __init__(self, tabla, tokenizador):
+        self._tabla = tabla
+        self._tok = tokenizador
+        estados, aristas = self._producto()
+        filas, aceptacion = self._bajar_a_bytes(estados, aristas)
+        self._clasificar(filas)
+        ancho = self.num_clases
+        self.aceptacion = frozenset(i * ancho for i, a in enumerate(aceptacion) if a)
+        self.num_estados = len(filas)
+
+    # 1) producto por carácter -------------------------------------------
+
+    def _paso(self, q, i):
+        if q < 0:
+            return -1
+        return self._tabla.transiciones[q * self._tabla.ancho + i]
+
+    def _cerrar(self, estado):
+        """
+        Estado de la tabla al terminar la corrida de letras abierta.
+        """
+        tipo, q, nodo, q_chars = estado
+        if tipo == _VIVA:
+            if _FIN in nodo:
+                return self._paso(q, nodo[_FIN])
+            return q_chars
+        return q
+
+    def _siguiente(self, estado, c):
+        tok = self._tok
+        i = tok.caracteres.get(c, tok.desconocido)
+        tipo, q, nodo, q_chars = estado
+        if not c.isalpha():
+            return (_FUERA, self._paso(self._cerrar(estado), i), None, None)
+        if tipo == _MUERTA:
+            return (_MUERTA, self._paso(q, i), None, None)
+        if tipo == _FUERA:
+            nodo, q_chars = tok.raiz, q
+        nodo = nodo.get(c)
+        q_chars = self._paso(q_chars, i)
+        if nodo is None:
+            return (_MUERTA, q_chars, None, None)
+        return (_VIVA, q, nodo, q_chars)
+
+    def _producto(self):
+        """
+        Estados alcanzables del producto y sus transiciones por carácter.
+        Solo se miran los caracteres del alfabeto y de las palabras del
+        trie: cualquier otro lleva a la tabla al estado muerto.
+        """
+        caracteres = set(self._tok.caracteres)
+        pila = [self._tok.raiz]
+        while pila:
+            nodo = pila.pop()
+            for c, hijo in nodo.items():
+                if c != _FIN:
+                    caracteres.add(c)
+                    pila.append(hijo)
+        caracteres = sorted(caracteres)
+
+        def clave(e):
+            # los nodos del trie son dicts: se comparan por identidad
+            return (e[0], e[1], id(e[2]), e[3])
+
+        inicio = (_FUERA, 0, None, None)
+        numeros = {clave(inicio): 0}
+        estados = [inicio]
+        aristas = [{}]
+        cola = deque([inicio])
+        while cola:
+            e = cola.popleft()
+            n = numeros[clave(e)]
+            for c in caracteres:
+                d = self._siguiente(e, c)
+                if d[0] != _VIVA and d[1] < 0:
+                    continue  # estado muerto
+                k = clave(d)
+                if k not in numeros:
+                    numeros[k] = len(estados)
+                    estados.append(d)
+                    aristas.append({})
+                    cola.append(d)
+                aristas[n][c] = numeros[k]
+        return estados, aristas
+
+    # 2) bajada a bytes UTF-8 --------------------------------------------
+
+    def _bajar_a_bytes(self, estados, aristas):
+        """
+        Filas de 256 destinos (-1 = muerto) por estado de bytes y si cada
+        uno acepta. Los primeros len(estados) son los del producto.
+        """
+        filas = [[-1] * 256 for _ in estados]
+        aceptacion = [self._tabla.acepta_estado(self._cerrar(e)) for e in estados]
+        for origen, salidas in enumerate(aristas):
+            intermedios = {}  # prefijo de bytes -> estado intermedio
+            for c, destino in salidas.items():
+                codigo = c.encode('utf-8')
+                actual = origen
+                for k in range(1, len(codigo)):
+                    prefijo = codigo[:k]
+                    if prefijo not in intermedios:
+                        intermedios[prefijo] = len(filas)
+                        filas.append([-1] * 256)
+                        aceptacion.append(False)
+                        filas[actual][codigo[k - 1]] = intermedios[prefijo]
+                    actual = intermedios[prefijo]
+                filas[actual][codigo[-1]] = destino
+        return filas, aceptacion
+
+    def _clasificar(self, filas):
+        """
+        Agrupa los bytes con la misma columna en clases y arma la tabla
+        plana de ancho num_clases con los estados ya multiplicados.
+        """
+        columnas = {}
+        clases = bytearray(256)
+        for b in range(256):
+            columna = tuple(fila[b] for fila in filas)
+            clases[b] = columnas.setdefault(columna, len(columnas))
+        ancho = len(columnas)
+        self.clases = bytes(clases)
+        self.num_clases = ancho
+        representantes = {}
+        for b in range(256):
+            representantes.setdefault(clases[b], b)
+        self.transiciones = array('i', [-1]) * (len(filas) * ancho)
+        for s, fila in enumerate(filas):
+            base = s * ancho
+            for clase, b in representantes.items():
+                if fila[b] >= 0:
+                    self.transiciones[base + clase] = fila[b] * ancho
+
+    # simulación -----------------------------------------------------------
+
+    def avanzar(self, estado: int, datos) -> int:
+        """
+        Consume los bytes de datos desde 'estado' (ya multiplicado; el
+        inicial es 0) y retorna el estado alcanzado (-1 = muerto).
+        """
+        transiciones, clases = self.transiciones, self.clases
+        vista = memoryview(datos)
+        if vista.format != 'B' or vista.ndim != 1:
+            vista = vista.cast('B')
+        for b in vista:
+            estado = transiciones[estado + clases[b]]
+            if estado < 0:
+                return -1
+        return estado
+
+    def coincide(self, datos) -> bool:
+        """
+        True si la entrada completa (bytes UTF-8) está en el lenguaje.
+        """
+        return self.avanzar(0, datos) in self.aceptacion
+
+
+__all__ = ["AFDBytes"]
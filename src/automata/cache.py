@@ -0,0 +1,50 @@
+"""
+Módulo cache: caché LRU de tamaño fijo, usada por codegen (funciones
+generadas) y por el servicio de coincidencias (patrones compilados).
+Está en automata para que codegen no dependa de utils. No es
+thread-safe: quien la comparte entre hilos la protege con su propio
+Lock.
+"""
+
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Caché con capacidad fija: al llenarse se
+    descarta el usado hace más tiempo.
+    """
+
+    def __init__(self, capacidad: int):
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartes = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def obtener(self, clave):
+        valor = self._datos.get(clave)
+        if valor is None:
+            self.fallos += 1
+            return None
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave, valor):
+        self._datos[clave] = valor
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.capacidad:
+            self._datos.popitem(last=False)
+            self.descartes += 1
+
+
+__all__ = ["CacheLRU"]
@@ -0,0 +1,193 @@
+"""
+Generación de código: convierte un AFD (normalmente el minimizado) en el
+código fuente de una función Python dedicada que lo simula.
+
+Cada estado se despacha en línea (cadena de if/elif o una tabla dict
+constante si tiene muchas transiciones) y los estados muertos terminan
+la simulación de inmediato. El código se compila con compile/exec y se
+guarda en una caché LRU por hash del patrón (acotada a MAX_CACHE
+funciones, para procesos de larga duración como el servicio).
+"""
+
+import hashlib
+from collections import deque
+from threading import Lock
+
+from .cache import CacheLRU
+
+# con más transiciones que esto, el estado usa una tabla dict en vez de if/elif
+_MAX_COMPARACIONES = 3
+# con más estados que esto, el despacho por estado se parte en búsqueda binaria
+_MAX_CADENA_ESTADOS = 8
+
+# funciones generadas que se conservan; al llenarse se descarta la menos usada
+MAX_CACHE = 512
+
+_CACHE = CacheLRU(MAX_CACHE)  # clave -> (fuente, función)
+_CACHE_LOCK = Lock()
+
+
+def clave_patron(regex: str) -> str:
+    """
+    Hash estable de una expresión regular, usado como clave de la caché.
+    """
+    return hashlib.sha256(regex.encode('utf-8')).hexdigest()
+
+
+def _numerar(start):
+    """
+    Numera los estados alcanzables en orden BFS (el inicial es 0).
+    """
+    numeros = {start: 0}
+    orden = [start]
+    cola = deque([start])
+    while cola:
+        s = cola.popleft()
+        for sym in sorted(s.edges):
+            d = s.edges[sym]
+            if d not in numeros:
+                numeros[d] = len(orden)
+                orden.append(d)
+                cola.append(d)
+    return numeros, orden
+
+
+def _vivos(orden):
+    """
+    Estados desde los que se puede llegar a uno de aceptación.
+    """
+    inversa = {s: [] for s in orden}
+    for s in orden:
+        for d in s.edges.values():
+            inversa[d].append(s)
+    vivos = {s for s in orden if s.is_accept}
+    pila = list(vivos)
+    while pila:
+        s = pila.pop()
+        for p in inversa[s]:
+            if p not in vivos:
+                vivos.add(p)
+                pila.append(p)
+    return vivos
+
+
+def _cuerpo_estado(s, numeros, vivos, constantes, sangria):
+    """
+    Líneas que consumen 'tok' desde el estado s.
+    """
+    pad = ' ' * sangria
+    edges = [(sym, numeros[d]) for sym, d in sorted(s.edges.items()) if d in vivos]
+    if not edges:
+        return [f"{pad}return False"]
+    if len(edges) > _MAX_COMPARACIONES:
+        nombre = f"_T{numeros[s]}"
+        constantes[nombre] = dict(edges)
+        return [
+            f"{pad}estado = {nombre}.get(tok, -1)",
+            f"{pad}if estado < 0:",
+            f"{pad}    return False",
+        ]
+    lineas = []
+    for i, (sym, dest) in enumerate(edges):
+        kw = 'if' if i == 0 else 'elif'
+        lineas.append(f"{pad}{kw} tok == {sym!r}:")
+        lineas.append(f"{pad}    estado = {dest}")
+    lineas.append(f"{pad}else:")
+    lineas.append(f"{pad}    return False")
+    return lineas
+
+
+def _despacho(estados, numeros, vivos, constantes, sangria):
+    """
+    Despacho por número de estado: cadena if/elif para pocos estados,
+    búsqueda binaria sobre el número para muchos.
+    """
+    pad = ' ' * sangria
+    if len(estados) <= _MAX_CADENA_ESTADOS:
+        lineas = []
+        for i, s in enumerate(estados):
+            if len(estados) == 1:
+                lineas.extend(_cuerpo_estado(s, numeros, vivos, constantes, sangria))
+                break
+            kw = 'if' if i == 0 else ('elif' if i < len(estados) - 1 else 'else')
+            cond = f" estado == {numeros[s]}" if kw != 'else' else ''
+            lineas.append(f"{pad}{kw}{cond}:")
+            lineas.extend(_cuerpo_estado(s, numeros, vivos, constantes, sangria + 4))
+        return lineas
+    mitad = len(estados) // 2
+    corte = numeros[estados[mitad]]
+    return (
+        [f"{pad}if estado < {corte}:"]
+        + _despacho(estados[:mitad], numeros, vivos, constantes, sangria + 4)
+        + [f"{pad}else:"]
+        + _despacho(estados[mitad:], numeros, vivos, constantes, sangria + 4)
+    )
+
+
+def generar_fuente(start, nombre: str = 'coincide'):
+    """
+    Genera el código de una función nombre(tokens) -> bool que simula el
+    AFD que empieza en start. Retorna (fuente, constantes), donde
+    constantes son las tablas dict que el código usa como globales.
+    """
+    numeros, orden = _numerar(start)
+    vivos = _vivos(orden)
+    constantes = {}
+
+    if start not in vivos:
+        return f"def {nombre}(tokens):\n    return False\n", constantes
+
+    estados = [s for s in orden if s in vivos]  # ya ordenados por número
+    aceptacion = frozenset(numeros[s] for s in estados if s.is_accept)
+    constantes['_ACEPTA'] = aceptacion
+
+    lineas = [
+        f"def {nombre}(tokens):",
+        "    estado = 0",
+        "    for tok in tokens:",
+    ]
+    lineas.extend(_despacho(estados, numeros, vivos, constantes, 8))
+    lineas.append("    return estado in _ACEPTA")
+    return '\n'.join(lineas) + '\n', constantes
+
+
+def compilar_matcher(start, clave: str = None):
+    """
+    Genera, compila y devuelve la función que simula el AFD.
+    Si se da una clave (ver clave_patron), el resultado se guarda en la
+    caché y las siguientes llamadas con esa clave lo reutilizan.
+    """
+    if clave is not None:
+        with _CACHE_LOCK:
+            entrada = _CACHE.obtener(clave)
+        if entrada is not None:
+            return entrada[1]
+
+    fuente, constantes = generar_fuente(start)
+    nombre_archivo = f"<afd {clave[:12]}>" if clave else "<afd>"
+    espacio = dict(constantes)
+    exec(compile(fuente, nombre_archivo, 'exec'), espacio)
+    funcion = espacio['coincide']
+    funcion.fuente = fuente
+
+    if clave is not None:
+        with _CACHE_LOCK:
+            # otro hilo pudo generarla mientras tanto: se usa la primera
+            entrada = _CACHE.obtener(clave)
+            if entrada is None:
+                entrada = (fuente, funcion)
+                _CACHE.guardar(clave, entrada)
+            return entrada[1]
+    return funcion
+
+
+def matcher_en_cache(clave: str):
+    """
+    Función ya compilada para la clave, o None si no está en caché.
+    """
+    with _CACHE_LOCK:
+        entrada = _CACHE.obtener(clave)
+    return entrada[1] if entrada else None
+
+
+__all__ = ["clave_patron", "generar_fuente", "compilar_matcher", "matcher_en_cache"]
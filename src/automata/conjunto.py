@@ -0,0 +1,234 @@
+"""
+Conjunto de patrones con actualización incremental del AFD combinado.
+
+El AFN combinado es la unión de los AFN de cada patrón (disjuntos entre
+sí). Un estado del AFD es un conjunto de estados del AFN y sus
+transiciones dependen solo de ese conjunto, así que al agregar o quitar
+un patrón:
+- los estados del AFD que no contienen estados del patrón siguen siendo
+  válidos y se reutilizan tal cual desde dfa_map,
+- al quitar, solo se descartan los estados que contenían al patrón,
+- al agregar, solo se construyen los conjuntos nuevos que aparecen
+  desde el nuevo estado inicial.
+Cada estado del AFD guarda en 'patrones' los nombres de los patrones
+que acepta. Por lo mismo, dos estados equivalentes en una minimización
+lo siguen siendo después de agregar o quitar patrones, y minimizado()
+parte de las clases de la minimización anterior.
+"""
+
+from collections import deque
+
+from .contexto import ContextoCompilacion
+from .minimize import minimizar_afd
+from .simulate import epsilon_cierre
+from .state import recolectar_estados
+from .subset import DFAState
+from .thompson import construir_afn_desde_arbol
+
+
+class _Nodo:
+    """
+    Nodo del AFD cociente que minimiza ConjuntoPatrones.minimizado: una
+    clase de la minimización anterior o un estado nuevo.
+    """
+
+    def __init__(self, patrones):
+        self.miembros = []  # estados del AFD que representa
+        self.patrones = patrones
+        self.is_accept = bool(patrones)
+        self.edges = {}
+
+
+class ConjuntoPatrones:
+    def __init__(self):
+        self._ctx = ContextoCompilacion()
+        self._patrones = {}      # nombre -> estados del AFN del patrón
+        self._iniciales = {}     # nombre -> ε-cierre de su estado inicial
+        self._patron_de = {}     # estado del AFN -> nombre del patrón
+        self._duenos = {}        # estado de aceptación del AFN -> nombre
+        self._cierres = {}       # estado del AFN -> ε-cierre (frozenset)
+        self._dfa_map = {}       # frozenset de estados del AFN -> DFAState
+        self._por_patron = {}    # nombre -> claves de dfa_map que lo contienen
+        self._pendientes = []    # estados del AFD sin transiciones calculadas
+        self._inicio_conjunto = frozenset()
+        self._inicio = self._estado(self._inicio_conjunto)
+        self._expandir_pendientes()
+        self._min = None         # (start_min, min_states) cacheado
+        self._clase = {}         # estado del AFD -> MinState de self._min
+
+    def __len__(self):
+        return len(self._patrones)
+
+    def __contains__(self, nombre):
+        return nombre in self._patrones
+
+    def agregar(self, nombre, raiz):
+        """
+        Agrega el patrón 'nombre' a partir de su árbol sintáctico y
+        construye solo los estados del AFD que aparecen por él.
+        """
+        if nombre in self._patrones:
+            raise ValueError(f"El patrón '{nombre}' ya está en el conjunto")
+        afn = construir_afn_desde_arbol(raiz, self._ctx)
+        if afn.contadores:
+            raise ValueError(f"El patrón '{nombre}' usa repeticiones con contador")
+        estados = recolectar_estados(afn.start)
+        self._patrones[nombre] = estados
+        self._por_patron[nombre] = set()
+        for s in estados:
+            self._patron_de[s] = nombre
+        for s in afn.accepts:
+            self._duenos[s] = nombre
+
+        inicial = self._cierre(afn.start)
+        self._iniciales[nombre] = inicial
+        self._inicio_conjunto = self._inicio_conjunto | inicial
+        self._inicio = self._estado(self._inicio_conjunto)
+        self._expandir_pendientes()
+
+    def quitar(self, nombre):
+        """
+        Quita el patrón 'nombre'. Se descartan únicamente los estados del
+        AFD que contenían estados de su AFN; el resto se reutiliza.
+        """
+        if nombre not in self._patrones:
+            raise KeyError(nombre)
+        # las claves quedan también en el índice de otros patrones; no se
+        # limpian ahí porque un conjunto con estados de este AFN no puede
+        # volver a aparecer (los estados nuevos son objetos distintos)
+        for conjunto in self._por_patron.pop(nombre):
+            self._dfa_map.pop(conjunto, None)
+        for s in self._patrones.pop(nombre):
+            del self._patron_de[s]
+            self._duenos.pop(s, None)
+            self._cierres.pop(s, None)
+
+        self._inicio_conjunto = self._inicio_conjunto - self._iniciales.pop(nombre)
+        self._inicio = self._estado(self._inicio_conjunto)
+        self._expandir_pendientes()
+
+    def _cierre(self, s):
+        """
+        ε-cierre de un único estado del AFN, cacheado.
+        """
+        cierre = self._cierres.get(s)
+        if cierre is None:
+            cierre = frozenset(epsilon_cierre({s}))
+            self._cierres[s] = cierre
+        return cierre
+
+    def _estado(self, conjunto):
+        """
+        Estado del AFD para un conjunto de estados del AFN; se reutiliza
+        si ya existe y, si es nuevo, queda pendiente de expandir.
+        """
+        estado = self._dfa_map.get(conjunto)
+        if estado is None:
+            patrones = frozenset(self._duenos[s] for s in conjunto if s in self._duenos)
+            estado = DFAState(self._ctx, conjunto, is_accept=bool(patrones))
+            estado.patrones = patrones
+            self._dfa_map[conjunto] = estado
+            for nombre in {self._patron_de[s] for s in conjunto}:
+                self._por_patron[nombre].add(conjunto)
+            self._pendientes.append(estado)
+        return estado
+
+    def _expandir_pendientes(self):
+        """
+        Algoritmo de subconjuntos limitado a los estados nuevos: solo se
+        miran los símbolos que salen de cada conjunto.
+        """
+        while self._pendientes:
+            actual = self._pendientes.pop()
+            movidos = {}
+            for s in actual.nfa_states:
+                for sym, dests in s.edges.items():
+                    movidos.setdefault(sym, set()).update(dests)
+            for sym, dests in movidos.items():
+                cierre = frozenset().union(*(self._cierre(d) for d in dests))
+                actual.edges[sym] = self._estado(cierre)
+
+    def afd(self):
+        """
+        AFD combinado actual: (estado_inicial, lista_de_estados alcanzables).
+        """
+        vistos = {self._inicio}
+        cola = deque([self._inicio])
+        while cola:
+            s = cola.popleft()
+            for d in s.edges.values():
+                if d not in vistos:
+                    vistos.add(d)
+                    cola.append(d)
+        return self._inicio, list(vistos)
+
+    def minimizado(self):
+        """
+        AFD combinado minimizado, separando los estados por el conjunto de
+        patrones que aceptan.
+
+        Cada llamada recorre el AFD alcanzable (O(n·|Σ|) para n estados).
+        Si es el mismo que en la minimización anterior (por ejemplo, tras
+        agregar y quitar un patrón) se devuelve el resultado cacheado.
+        Si no, se minimiza el cociente que junta en un nodo cada clase
+        anterior que sigue alcanzable y deja solos los estados nuevos: con
+        k nodos cuesta O(k²·|Σ|) en el peor caso (un refinamiento por
+        ronda) en lugar de O(n²·|Σ|) sobre el AFD entero.
+        """
+        start, estados = self.afd()
+        if self._min is not None and len(estados) == len(self._clase) \
+                and all(s in self._clase for s in estados):
+            return self._min
+
+        nodos = {}  # MinState anterior (o estado nuevo) -> _Nodo
+        nodo_de = {}
+        for s in estados:
+            clave = self._clase.get(s, s)
+            nodo = nodos.get(clave)
+            if nodo is None:
+                nodo = nodos[clave] = _Nodo(s.patrones)
+            nodo.miembros.append(s)
+            nodo_de[s] = nodo
+        for nodo in nodos.values():
+            # todos los miembros tienen el mismo futuro: basta uno
+            for sym, d in nodo.miembros[0].edges.items():
+                nodo.edges[sym] = nodo_de[d]
+
+        start_min, min_states = minimizar_afd(
+            nodo_de[start], list(nodos.values()), self._ctx, clave=lambda n: n.patrones)
+        self._clase = {}
+        for m in min_states:
+            m.nfa_set = {s for nodo in m.nfa_set for s in nodo.miembros}
+            m.patrones = next(iter(m.nfa_set)).patrones
+            for s in m.nfa_set:
+                self._clase[s] = m
+        self._min = (start_min, min_states)
+        return self._min
+
+    def coincidencias(self, tokens: list[str]) -> frozenset:
+        """
+        Nombres de los patrones que aceptan la cadena tokenizada.
+        """
+        actual = self._inicio
+        for tok in tokens:
+            actual = actual.edges.get(tok)
+            if actual is None:
+                return frozenset()
+        return actual.patrones
+
+    def compactar(self):
+        """
+        Descarta de dfa_map los estados que ya no son alcanzables.
+        Mientras se conservan sirven para reutilizarlos si se vuelve
+        a un conjunto de patrones anterior.
+        """
+        _, alcanzables = self.afd()
+        vivos = {s.nfa_states for s in alcanzables}
+        for conjunto in list(self._dfa_map):
+            if conjunto not in vivos:
+                del self._dfa_map[conjunto]
+        for claves in self._por_patron.values():
+            claves.intersection_update(vivos)
+
+
+__all__ = ["ConjuntoPatrones"]
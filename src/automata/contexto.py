@@ -0,0 +1,33 @@
+"""
+Definición de la clase ContextoCompilacion: estado propio de una
+compilación (ids de estados, buffers temporales y parámetros).
+Cada compilación usa su propio contexto, así varias expresiones pueden
+compilarse a la vez en hilos distintos sin compartir contadores globales.
+"""
+
+
+class ContextoCompilacion:
+    def __init__(self, max_estados_expansion=None):
+        # siguiente id libre por tipo de estado
+        self._siguiente = {'afn': 0, 'afd': 0, 'min': 0}
+        # buffer del algoritmo de subconjuntos: conjunto movido -> ε-cierre
+        self.cierres = {}
+        # contadores de repeticiones {m,n} con cotas grandes
+        self.contadores = []
+        # tope de estados para expandir una repetición en lugar de usar un
+        # contador (None = thompson.MAX_ESTADOS_EXPANSION)
+        self.max_estados_expansion = max_estados_expansion
+
+    def nuevo_id(self, tipo: str) -> int:
+        """
+        Asigna el siguiente id para un estado de tipo 'afn', 'afd' o 'min'.
+        """
+        n = self._siguiente[tipo]
+        self._siguiente[tipo] = n + 1
+        return n
+
+    def limpiar_buffers(self):
+        """
+        Libera los buffers temporales (los ids no se reinician).
+        """
+        self.cierres.clear()
@@ -1,32 +1,30 @@
 """
 Funciones para dibujar AFNs y AFDs usando Graphviz.
 Los resultados se guardan en src/results/.
+
+Los tres dibujos comparten la misma implementación:
+- las aristas paralelas entre dos estados se unen en una sola con una
+  etiqueta compacta de rangos (ej. 'a-z,0-9,ε')
+- con más de max_nodos estados o max_aristas aristas se dibuja solo la
+  parte más cercana al inicio y un nodo resumen con lo omitido
+- formato='dot' o 'json' exporta el grafo sin ejecutar el layout de dot
+graphviz se importa y la carpeta se crea recién al dibujar, así que
+importar este módulo no tiene efectos ni requiere graphviz.
 """
 
 import os
-from graphviz import Digraph
-from .state import State
+import json
+from collections import deque
+from .state import recolectar_estados
 
-# Carpeta donde se guardarán las imágenes
+# Carpeta donde se guardarán las imágenes (se crea al dibujar)
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), "..", "results")
-os.makedirs(RESULTS_DIR, exist_ok=True)
 
+# Límites por defecto para dibujos en png/dot
+MAX_NODOS = 150
+MAX_ARISTAS = 600
 
-def _recolectar_estados(start):
-    """
-    Recorre todos los estados alcanzables desde un estado inicial.
-    """
-    vistos = set()
-    pila = [start]
-    while pila:
-        s = pila.pop()
-        if s in vistos:
-            continue
-        vistos.add(s)
-        for dests in s.edges.values():
-            pila.extend(dests)
-        pila.extend(s.eps)
-    return vistos
+FORMATOS = {'png', 'dot', 'json'}
 
 
 def _mostrar_simbolo(sym):
@@ -40,74 +38,196 @@ def _mostrar_simbolo(sym):
     return sym
 
 
-def dibujar_afn(fragment, filename, aceptar_ids=None):
+def _etiqueta_rango(simbolos):
     """
-    Dibuja un AFN construido con Thompson.
+    Une los símbolos de varias aristas paralelas en una etiqueta compacta:
+    caracteres consecutivos (3 o más) se muestran como rango 'a-z', el
+    resto separados por comas; None se muestra como 'ε'.
     """
-    if aceptar_ids is None:
-        aceptar_ids = {s.id for s in fragment.accepts}
-    dot = Digraph()
-    dot.attr(rankdir='LR')
-
-    dot.node('start', shape='point')
-    dot.edge('start', str(fragment.start.id), label='')
-
-    estados = _recolectar_estados(fragment.start)
-
-    for s in estados:
-        shape = 'doublecircle' if s.id in aceptar_ids else 'circle'
-        dot.node(str(s.id), shape=shape, label=f'q{s.id}')
-
+    chars = sorted({s for s in simbolos if s is not None and len(s) == 1}, key=ord)
+    otros = sorted({s for s in simbolos if s is not None and len(s) != 1})
+    partes = []
+    i = 0
+    while i < len(chars):
+        j = i
+        while j + 1 < len(chars) and ord(chars[j + 1]) == ord(chars[j]) + 1:
+            j += 1
+        if j - i >= 2:
+            partes.append(f"{_mostrar_caracter(chars[i])}-{_mostrar_caracter(chars[j])}")
+        else:
+            partes.extend(_mostrar_caracter(c) for c in chars[i:j + 1])
+        i = j + 1
+    partes.extend(_mostrar_simbolo(s) for s in otros)
+    if None in simbolos:
+        partes.append('ε')
+    return ','.join(partes)
+
+
+def _mostrar_caracter(c):
+    # ',' y '-' se citan para no confundirlos con los separadores del rango
+    if c in {',', '-'}:
+        return f"'{c}'"
+    return _mostrar_simbolo(c)
+
+
+def _grafo_afn(fragment, aceptar_ids):
+    """
+    Grafo genérico del AFN: (id inicial, nodos, aristas) donde nodos es
+    una lista (id, etiqueta, acepta) y aristas un dict
+    (origen, destino) -> lista de símbolos (None = ε; las transiciones
+    con contador se muestran como 'c<k>:<operación>').
+    """
+    estados = sorted(recolectar_estados(fragment.start), key=lambda s: s.id)
+    nodos = [(s.id, f'q{s.id}', s.id in aceptar_ids) for s in estados]
+    aristas = {}
     for s in estados:
         for sym, dests in s.edges.items():
             for d in dests:
-                dot.edge(str(s.id), str(d.id), label=_mostrar_simbolo(sym))
+                aristas.setdefault((s.id, d.id), []).append(sym)
         for d in s.eps:
-            dot.edge(str(s.id), str(d.id), label='ε')
+            aristas.setdefault((s.id, d.id), []).append(None)
+        for d, cont, op in s.eps_cont:
+            aristas.setdefault((s.id, d.id), []).append(f'c{cont.indice}:{op}')
+    return fragment.start.id, nodos, aristas
 
-    output_path = os.path.join(RESULTS_DIR, filename)
-    dot.render(output_path, format='png', cleanup=True)
+
+def _grafo_afd(start, estados, prefijo):
+    """
+    Grafo genérico de un AFD (o AFD minimizado), igual que _grafo_afn.
+    """
+    estados = sorted(estados, key=lambda s: s.id)
+    nodos = [(s.id, f'{prefijo}{s.id}', s.is_accept) for s in estados]
+    aristas = {}
+    for s in estados:
+        for sym, dest in s.edges.items():
+            aristas.setdefault((s.id, dest.id), []).append(sym)
+    return start.id, nodos, aristas
 
 
-def dibujar_afd(start_dfa, estados, filename):
+def _limitar(inicio, nodos, aristas, max_nodos, max_aristas):
     """
-    Dibuja un AFD construido con el algoritmo de subconjuntos.
+    Recorta el grafo a los max_nodos estados más cercanos al inicial (BFS)
+    y a max_aristas aristas, conservando las más cercanas (por distancia
+    del origen y después del destino). Las aristas hacia estados omitidos
+    se unen en una hacia un nodo 'resumen'. Retorna (nodos, aristas,
+    omitidos) con omitidos = (estados, aristas) que no se dibujan; las
+    aristas unidas hacia 'resumen' se dibujan y no cuentan como omitidas.
     """
+    if len(nodos) <= max_nodos and len(aristas) <= max_aristas:
+        return nodos, aristas, (0, 0)
+
+    sucesores = {}
+    for (o, d) in aristas:
+        sucesores.setdefault(o, []).append(d)
+    distancia = {inicio: 0}
+    cola = deque([inicio])
+    while cola and len(distancia) < max_nodos:
+        o = cola.popleft()
+        for d in sucesores.get(o, ()):
+            if d not in distancia and len(distancia) < max_nodos:
+                distancia[d] = distancia[o] + 1
+                cola.append(d)
+
+    nuevos_nodos = [n for n in nodos if n[0] in distancia]
+    nuevas = {}
+    originales = {}  # arista dibujada -> cuántas aristas del grafo une
+    aristas_omitidas = 0
+    for (o, d), syms in aristas.items():
+        if o not in distancia:
+            aristas_omitidas += 1
+            continue
+        destino = d if d in distancia else 'resumen'
+        nuevas.setdefault((o, destino), []).extend(syms)
+        originales[(o, destino)] = originales.get((o, destino), 0) + 1
+    if len(nuevas) > max_aristas:
+        lejos = len(distancia)  # 'resumen' va después de cualquier estado
+        orden = sorted(nuevas, key=lambda k: (distancia[k[0]], distancia.get(k[1], lejos)))
+        for clave in orden[max_aristas:]:
+            aristas_omitidas += originales[clave]
+        nuevas = {clave: nuevas[clave] for clave in orden[:max_aristas]}
+    omitidos = (len(nodos) - len(nuevos_nodos), aristas_omitidas)
+    return nuevos_nodos, nuevas, omitidos
+
+
+def _exportar_json(inicio, nodos, aristas, ruta):
+    datos = {
+        "inicio": inicio,
+        "estados": [{"id": i, "etiqueta": e, "acepta": a} for i, e, a in nodos],
+        "transiciones": [
+            {"origen": o, "destino": d, "simbolos": syms}
+            for (o, d), syms in aristas.items()
+        ],
+    }
+    with open(ruta + '.json', 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False)
+
+
+def _dibujar(grafo, filename, formato, max_nodos, max_aristas):
+    """
+    Implementación común de los dibujos: une aristas paralelas, aplica
+    los límites de tamaño y exporta en png (con layout), dot o json.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de dibujo no soportado: {formato}")
+    inicio, nodos, aristas = grafo
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, filename)
+
+    if formato == 'json':
+        _exportar_json(inicio, nodos, aristas, output_path)
+        return
+
+    nodos, aristas, (estados_omitidos, aristas_omitidas) = _limitar(
+        inicio, nodos, aristas, max_nodos, max_aristas)
+
+    from graphviz import Digraph  # import diferido: solo hace falta para dibujar
     dot = Digraph()
     dot.attr(rankdir='LR')
 
     dot.node('start', shape='point')
-    dot.edge('start', str(start_dfa.id))
+    dot.edge('start', str(inicio), label='')
 
-    for s in estados:
-        shape = 'doublecircle' if s.is_accept else 'circle'
-        dot.node(str(s.id), shape=shape, label=f'D{s.id}')
+    for ident, etiqueta, acepta in nodos:
+        shape = 'doublecircle' if acepta else 'circle'
+        dot.node(str(ident), shape=shape, label=etiqueta)
 
-    for s in estados:
-        for sym, dest in s.edges.items():
-            dot.edge(str(s.id), str(dest.id), label=_mostrar_simbolo(sym))
+    if estados_omitidos or aristas_omitidas:
+        dot.node('resumen', shape='note',
+                 label=f'… {estados_omitidos} estados y {aristas_omitidas} aristas omitidos')
 
-    output_path = os.path.join(RESULTS_DIR, filename)
-    dot.render(output_path, format='png', cleanup=True)
+    for (o, d), syms in aristas.items():
+        dot.edge(str(o), str(d), label=_etiqueta_rango(syms))
 
-def dibujar_afd_min(start_min, estados, filename):
+    if formato == 'dot':
+        dot.save(output_path + '.dot')
+    else:
+        dot.render(output_path, format='png', cleanup=True)
+
+
+def dibujar_afn(fragment, filename, aceptar_ids=None, formato='png',
+                max_nodos=MAX_NODOS, max_aristas=MAX_ARISTAS):
     """
-    Dibuja el AFD minimizado.
+    Dibuja un AFN construido con Thompson.
     """
-    dot = Digraph()
-    dot.attr(rankdir='LR')
-
-    dot.node('start', shape='point')
-    dot.edge('start', str(start_min.id))
+    if aceptar_ids is None:
+        aceptar_ids = {s.id for s in fragment.accepts}
+    _dibujar(_grafo_afn(fragment, aceptar_ids), filename,
+             formato, max_nodos, max_aristas)
 
-    for s in estados:
-        shape = 'doublecircle' if s.is_accept else 'circle'
-        dot.node(str(s.id), shape=shape, label=f'M{s.id}')
 
-    for s in estados:
-        for sym, dest in s.edges.items():
-            dot.edge(str(s.id), str(dest.id), label=_mostrar_simbolo(sym))
+def dibujar_afd(start_dfa, estados, filename, formato='png',
+                max_nodos=MAX_NODOS, max_aristas=MAX_ARISTAS):
+    """
+    Dibuja un AFD construido con el algoritmo de subconjuntos.
+    """
+    _dibujar(_grafo_afd(start_dfa, estados, 'D'), filename,
+             formato, max_nodos, max_aristas)
 
-    output_path = os.path.join(RESULTS_DIR, filename)
-    dot.render(output_path, format='png', cleanup=True)
 
+def dibujar_afd_min(start_min, estados, filename, formato='png',
+                    max_nodos=MAX_NODOS, max_aristas=MAX_ARISTAS):
+    """
+    Dibuja el AFD minimizado.
+    """
+    _dibujar(_grafo_afd(start_min, estados, 'M'), filename,
+             formato, max_nodos, max_aristas)
@@ -0,0 +1,129 @@
+"""
+Comparación de lenguajes entre autómatas (AFN, AFD o AFDmin).
+- equivalentes: Hopcroft–Karp con union-find sobre el producto de los AFD
+- incluido: L(A) ⊆ L(B)
+- interseccion_vacia: L(A) ∩ L(B) = ∅
+Cuando la respuesta es negativa se devuelve la cadena más corta que lo
+demuestra (lista de símbolos).
+"""
+
+from collections import deque
+
+from .fragment import Fragment
+from .subset import construir_afd_desde_afn
+
+
+def _como_afd(automata):
+    """
+    Acepta un Fragment (AFN) o el estado inicial de un AFD/AFDmin y
+    devuelve siempre el estado inicial de un AFD.
+    """
+    if isinstance(automata, Fragment):
+        start_dfa, _ = construir_afd_desde_afn(automata)
+        return start_dfa
+    return automata
+
+
+def _acepta(estado) -> bool:
+    # None representa el estado muerto (transición ausente)
+    return estado is not None and estado.is_accept
+
+
+def _simbolos(p, q):
+    """
+    Símbolos salientes del par (p, q), en orden fijo.
+    """
+    syms = set()
+    if p is not None:
+        syms.update(p.edges)
+    if q is not None:
+        syms.update(q.edges)
+    return sorted(syms)
+
+
+def _siguiente(estado, sym):
+    return None if estado is None else estado.edges.get(sym)
+
+
+def _buscar_par(start_a, start_b, condicion):
+    """
+    BFS sobre el producto de los dos AFD. Retorna la cadena más corta
+    que lleva a un par (p, q) con condicion(p, q), o None si no existe.
+    """
+    inicio = (id(start_a), id(start_b))
+    padres = {inicio: None}
+    cola = deque([(start_a, start_b)])
+    while cola:
+        p, q = cola.popleft()
+        clave = (id(p), id(q))
+        if condicion(p, q):
+            cadena = []
+            while padres[clave] is not None:
+                clave, sym = padres[clave]
+                cadena.append(sym)
+            return cadena[::-1]
+        for sym in _simbolos(p, q):
+            p2, q2 = _siguiente(p, sym), _siguiente(q, sym)
+            clave2 = (id(p2), id(q2))
+            if clave2 not in padres:
+                padres[clave2] = (clave, sym)
+                cola.append((p2, q2))
+    return None
+
+
+def equivalentes(a, b):
+    """
+    Decide si L(A) = L(B) con el algoritmo de Hopcroft–Karp: recorre el
+    producto uniendo pares en un union-find, así cada estado se visita
+    casi una sola vez. Retorna (True, None) o (False, contraejemplo).
+    """
+    start_a, start_b = _como_afd(a), _como_afd(b)
+
+    # estados de A y B se distinguen por lado (0/1) e id del objeto
+    padre = {}
+
+    def find(x):
+        padre.setdefault(x, x)
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    padre[find((0, id(start_a)))] = find((1, id(start_b)))
+    cola = deque([(start_a, start_b)])
+    while cola:
+        p, q = cola.popleft()
+        if _acepta(p) != _acepta(q):
+            contraejemplo = _buscar_par(
+                start_a, start_b, lambda x, y: _acepta(x) != _acepta(y))
+            return False, contraejemplo
+        for sym in _simbolos(p, q):
+            p2, q2 = _siguiente(p, sym), _siguiente(q, sym)
+            r1, r2 = find((0, id(p2))), find((1, id(q2)))
+            if r1 != r2:
+                padre[r1] = r2
+                cola.append((p2, q2))
+    return True, None
+
+
+def incluido(a, b):
+    """
+    Decide si L(A) ⊆ L(B). Retorna (True, None) o (False, w) con w la
+    cadena más corta aceptada por A y rechazada por B.
+    """
+    w = _buscar_par(_como_afd(a), _como_afd(b),
+                    lambda x, y: _acepta(x) and not _acepta(y))
+    return w is None, w
+
+
+def interseccion_vacia(a, b):
+    """
+    Decide si L(A) ∩ L(B) = ∅. Retorna (True, None) o (False, w) con w
+    la cadena más corta aceptada por ambos.
+    """
+    w = _buscar_par(_como_afd(a), _como_afd(b),
+                    lambda x, y: _acepta(x) and _acepta(y))
+    return w is None, w
+
+
+__all__ = ["equivalentes", "incluido", "interseccion_vacia"]
@@ -7,3 +7,4 @@ class Fragment:
     def __init__(self, start, accepts):
         self.start = start
         self.accepts = set(accepts)
+        self.contadores = ()  # Contadores usados (solo en el AFN completo)
@@ -2,26 +2,51 @@
 Algoritmo de minimización de AFD usando particiones (Hopcroft simplificado).
 """
 
-def minimizar_afd(start_dfa, estados):
+from .contexto import ContextoCompilacion
+
+
+class MinState:
+    def __init__(self, ctx, nfa_set, is_accept=False):
+        self.id = ctx.nuevo_id('min')
+        self.nfa_set = nfa_set
+        self.edges = {}
+        self.is_accept = is_accept
+
+
+def minimizar_afd(start_dfa, estados, ctx=None, clave=None):
     """
     Recibe el AFD como (estado inicial, lista de estados DFA).
+    Los ids de los estados nuevos salen de ctx (uno nuevo si es None).
+    clave(estado) define la partición inicial; por defecto se separan
+    finales y no finales (is_accept).
     Devuelve (nuevo_estado_inicial, lista_de_estados_minimizados).
     """
+    if ctx is None:
+        ctx = ContextoCompilacion()
+
     # alfabeto
     alphabet = set()
     for s in estados:
         alphabet.update(s.edges.keys())
 
-    # particiones iniciales: finales y no finales
-    F = {s for s in estados if s.is_accept}
-    NF = set(estados) - F
-    P = [F, NF] if NF else [F]
+    # particiones iniciales: finales y no finales (o según clave)
+    if clave is None:
+        clave = lambda s: s.is_accept
+    iniciales = {}
+    for s in estados:
+        iniciales.setdefault(clave(s), set()).add(s)
+    P = list(iniciales.values())
 
     # refinamiento de particiones
     changed = True
     while changed:
         changed = False
         new_P = []
+        # índice estado -> grupo, para no buscar el destino grupo por grupo
+        grupo_de = {}
+        for idx, g in enumerate(P):
+            for s in g:
+                grupo_de[s] = idx
         for group in P:
             # dividir grupo por comportamiento frente a cada símbolo
             partitions = {}
@@ -29,13 +54,8 @@ def minimizar_afd(start_dfa, estados):
                 signature = []
                 for sym in alphabet:
                     target = state.edges.get(sym, None)
-                    # buscar a qué grupo pertenece el destino
-                    dest_group = None
-                    for idx, g in enumerate(P):
-                        if target in g:
-                            dest_group = idx
-                            break
-                    signature.append(dest_group)
+                    # grupo al que pertenece el destino (None = muerto)
+                    signature.append(grupo_de.get(target))
                 signature = tuple(signature)
                 partitions.setdefault(signature, set()).add(state)
             if len(partitions) > 1:
@@ -46,21 +66,12 @@ def minimizar_afd(start_dfa, estados):
         P = new_P
 
     # crear nuevos estados minimizados
-    class MinState:
-        _next_id = 0
-        def __init__(self, nfa_set, is_accept=False):
-            self.id = MinState._next_id
-            MinState._next_id += 1
-            self.nfa_set = nfa_set
-            self.edges = {}
-            self.is_accept = is_accept
-
     state_map = {}
     min_states = []
     for group in P:
         repr_state = next(iter(group))
         is_accept = repr_state.is_accept
-        new_state = MinState(group, is_accept)
+        new_state = MinState(ctx, group, is_accept)
         min_states.append(new_state)
         for s in group:
             state_map[s] = new_state
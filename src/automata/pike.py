@@ -0,0 +1,71 @@
+"""
+Máquina de Pike: extracción de grupos de captura en tiempo lineal sobre
+el AFN de Thompson construido con capturas=True.
+
+Cada hilo es un estado del AFN, los valores de sus contadores y sus
+ranuras de captura. Los hilos se mantienen en una lista ordenada por
+prioridad y, para cada (estado, contadores), solo sobrevive el de mayor
+prioridad, así que el costo es O(|entrada| × |estados|) y el resultado es
+el mismo que daría un motor con backtracking (rama izquierda de '|' y
+repeticiones codiciosas primero), sin sus casos exponenciales.
+"""
+
+from .simulate import _paso_contador, _simbolo_coincide
+
+
+def _agregar(hilos, vistos, estado, valores, ranuras, pos, posiciones):
+    """
+    Agrega el hilo y todo lo alcanzable por ε en orden de prioridad
+    (recorrido en profundidad con pila explícita).
+    """
+    pila = [(estado, valores, ranuras)]
+    while pila:
+        s, valores, ranuras = pila.pop()
+        clave = (s, valores)
+        if clave in vistos:
+            continue
+        vistos.add(clave)
+        if s.guardar is not None:
+            ranuras = ranuras[:s.guardar] + (pos,) + ranuras[s.guardar + 1:]
+        hilos.append((s, valores, ranuras))
+        siguientes = []
+        for d, cont, op in s.eps_cont:
+            i = posiciones[cont]
+            nuevo = _paso_contador(cont, valores[i], op)
+            if nuevo is not None:
+                siguientes.append((d, valores[:i] + (nuevo,) + valores[i + 1:], ranuras))
+        siguientes.extend((d, valores, ranuras) for d in s.eps)
+        pila.extend(reversed(siguientes))
+
+
+def capturar(fragment, tokens: list[str], num_grupos: int):
+    """
+    Simula el AFN con capturas sobre los tokens. Si la entrada completa
+    coincide retorna la tupla de ranuras (posiciones en tokens: 2k y
+    2k+1 son inicio y fin del grupo k, None si no participó); si no,
+    retorna None.
+    """
+    posiciones = {c: i for i, c in enumerate(fragment.contadores)}
+    valores = (0,) * len(fragment.contadores)
+    ranuras = (None,) * (2 * num_grupos + 2)
+
+    actuales = []
+    _agregar(actuales, set(), fragment.start, valores, ranuras, 0, posiciones)
+    for pos, tok in enumerate(tokens, 1):
+        siguientes, vistos = [], set()
+        for s, valores, ranuras in actuales:
+            for sym, dests in s.edges.items():
+                if _simbolo_coincide(sym, tok):
+                    for d in dests:
+                        _agregar(siguientes, vistos, d, valores, ranuras, pos, posiciones)
+        if not siguientes:
+            return None
+        actuales = siguientes
+
+    for s, _, ranuras in actuales:
+        if s in fragment.accepts:
+            return (0, len(tokens)) + ranuras[2:]
+    return None
+
+
+__all__ = ["capturar"]
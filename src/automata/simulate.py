@@ -60,6 +60,8 @@ def acepta(fragment, tokens: list[str]) -> bool:
     """
     Simula un AFN con una lista de tokens (no caracteres sueltos).
     """
+    if fragment.contadores:
+        return acepta_conteo(fragment, tokens)
     current = epsilon_cierre({fragment.start})
     for tok in tokens:
         current = epsilon_cierre(mover(current, tok))
@@ -68,6 +70,65 @@ def acepta(fragment, tokens: list[str]) -> bool:
     return any(st in current for st in fragment.accepts)
 
 
+def _paso_contador(cont, valor, op):
+    """
+    Nuevo valor del contador tras la operación op, o None si no se puede.
+    """
+    if op == 'iniciar':
+        return 0
+    hechas = valor + 1
+    if op == 'repetir':
+        if cont.maximo is None:
+            # sin tope solo importa si ya se alcanzó el mínimo
+            return min(hechas, cont.minimo)
+        return hechas if hechas < cont.maximo else None
+    return 0 if hechas >= cont.minimo else None  # 'salir'
+
+
+def cierre_conteo(configs, posiciones):
+    """
+    ε-cierre de configuraciones (estado, valores de los contadores),
+    siguiendo también las transiciones eps_cont.
+    """
+    stack = list(configs)
+    seen = set(configs)
+    while stack:
+        s, valores = stack.pop()
+        siguientes = [(nxt, valores) for nxt in s.eps]
+        for nxt, cont, op in s.eps_cont:
+            i = posiciones[cont]
+            nuevo = _paso_contador(cont, valores[i], op)
+            if nuevo is not None:
+                siguientes.append((nxt, valores[:i] + (nuevo,) + valores[i + 1:]))
+        for config in siguientes:
+            if config not in seen:
+                seen.add(config)
+                stack.append(config)
+    return seen
+
+
+def acepta_conteo(fragment, tokens: list[str]) -> bool:
+    """
+    Simula un AFN con repeticiones por contador: cada configuración es
+    un estado y el valor de cada contador. Las configuraciones posibles
+    están acotadas por los topes (o por el mínimo si no hay tope), así
+    que una repetición {1,10000} no multiplica los estados del AFN.
+    """
+    posiciones = {c: i for i, c in enumerate(fragment.contadores)}
+    inicio = (0,) * len(fragment.contadores)
+    current = cierre_conteo({(fragment.start, inicio)}, posiciones)
+    for tok in tokens:
+        movidas = set()
+        for s, valores in current:
+            for sym, dests in s.edges.items():
+                if _simbolo_coincide(sym, tok):
+                    movidas.update((d, valores) for d in dests)
+        if not movidas:
+            return False
+        current = cierre_conteo(movidas, posiciones)
+    return any(s in fragment.accepts for s, _ in current)
+
+
 def acepta_afd(start_dfa, tokens: list[str]) -> bool:
     """
     Simula un AFD con una lista de tokens.
@@ -1,16 +1,55 @@
 """
 Definición de la clase State: representa un estado en el AFN.
 Cada estado tiene:
-- id único
+- id único dentro de su ContextoCompilacion
 - transiciones etiquetadas (edges)
-- transiciones epsilon (eps)
+- transiciones epsilon (eps), en orden de prioridad (la primera es la
+  preferida al extraer grupos; ver automata.pike)
+- transiciones epsilon con contador (eps_cont), solo en repeticiones
+  {m,n} con cotas grandes; ver Contador
+- guardar: en el AFN con grupos, número de ranura donde se guarda la
+  posición actual al pasar por el estado
 """
 
 class State:
-    _next_id = 0  # contador global
+    eps_cont = ()  # lista de (destino, Contador, operación) si se usa
+    guardar = None  # ranura de captura (solo en el AFN con grupos)
 
-    def __init__(self):
-        self.id = State._next_id
-        State._next_id += 1
+    def __init__(self, ctx):
+        self.id = ctx.nuevo_id('afn')
         self.edges = {}   # dict[str, set[State]]
-        self.eps = set()  # transiciones epsilon
+        self.eps = []     # transiciones epsilon (en orden de prioridad)
+
+
+class Contador:
+    """
+    Contador de una repetición A{minimo,maximo} (maximo None = sin tope).
+    Las transiciones eps_cont lo usan con tres operaciones:
+      - 'iniciar': entrar a la primera iteración (valor = 0)
+      - 'repetir': terminar una iteración y empezar otra (valor + 1 < maximo)
+      - 'salir'  : terminar una iteración y salir (valor + 1 >= minimo)
+    El valor cuenta las iteraciones ya terminadas.
+    """
+
+    def __init__(self, indice, minimo, maximo):
+        self.indice = indice
+        self.minimo = minimo
+        self.maximo = maximo
+
+
+def recolectar_estados(start):
+    """
+    Recorre todos los estados alcanzables desde un estado inicial.
+    """
+    vistos = set()
+    pila = [start]
+    while pila:
+        s = pila.pop()
+        if s in vistos:
+            continue
+        vistos.add(s)
+        for dests in s.edges.values():
+            pila.extend(dests)
+        pila.extend(s.eps)
+        pila.extend(d for d, _, _ in s.eps_cont)
+    return vistos
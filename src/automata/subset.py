@@ -1,17 +1,32 @@
 """
 Algoritmo de subconjuntos: convierte un AFN en un AFD.
+- Sin contadores cada estado del AFD es un conjunto de estados del AFN.
+- Con contadores (repeticiones {m,n} grandes) es un conjunto de
+  configuraciones (estado, valores de los contadores), como en
+  acepta_conteo; los valores están acotados, así que el AFD es finito.
+- La construcción se corta si el AFD pasa de max_estados estados
+  (AFDDemasiadoGrande): hay expresiones cuyo AFD crece exponencialmente,
+  como (a|b)*a(a|b){n}, y con ellas solo se puede simular el AFN.
 """
 
-from .simulate import epsilon_cierre, mover
+from .simulate import epsilon_cierre, mover, cierre_conteo, _simbolo_coincide
+from .state import recolectar_estados
+from .contexto import ContextoCompilacion
 
+# tope de estados del AFD de subconjuntos
+MAX_ESTADOS_AFD = 2000
+
+
+class AFDDemasiadoGrande(ValueError):
+    """
+    El AFD de subconjuntos pasaría de max_estados estados.
+    """
 
-class DFAState:
-    _next_id = 0
 
-    def __init__(self, nfa_states, is_accept=False):
-        self.id = DFAState._next_id
-        DFAState._next_id += 1
-        self.nfa_states = frozenset(nfa_states)  # conjunto de estados del AFN
+class DFAState:
+    def __init__(self, ctx, nfa_states, is_accept=False):
+        self.id = ctx.nuevo_id('afd')
+        self.nfa_states = frozenset(nfa_states)  # estados (o configuraciones) del AFN
         self.edges = {}  # dict[símbolo, DFAState]
         self.is_accept = is_accept
 
@@ -25,15 +40,52 @@ class DFAState:
         return f"DFAState({self.id}, accept={self.is_accept})"
 
 
-def construir_afd_desde_afn(afn_fragment):
+def _por_estados(afn_fragment):
+    """
+    (conjunto inicial, mover, cierre, acepta) sobre estados del AFN.
+    """
+    def acepta(conjunto):
+        return bool(afn_fragment.accepts & conjunto)
+    return epsilon_cierre({afn_fragment.start}), mover, epsilon_cierre, acepta
+
+
+def _por_configuraciones(afn_fragment):
+    """
+    (conjunto inicial, mover, cierre, acepta) sobre configuraciones
+    (estado, valores de los contadores).
+    """
+    posiciones = {c: i for i, c in enumerate(afn_fragment.contadores)}
+    inicio = (afn_fragment.start, (0,) * len(afn_fragment.contadores))
+
+    def mover_conf(configs, token):
+        out = set()
+        for s, valores in configs:
+            for sym, dests in s.edges.items():
+                if _simbolo_coincide(sym, token):
+                    out.update((d, valores) for d in dests)
+        return out
+
+    def cierre(configs):
+        return cierre_conteo(configs, posiciones)
+
+    def acepta(configs):
+        return any(s in afn_fragment.accepts for s, _ in configs)
+    return cierre({inicio}), mover_conf, cierre, acepta
+
+
+def construir_afd_desde_afn(afn_fragment, ctx=None, max_estados=MAX_ESTADOS_AFD):
     """
     Construye un AFD a partir de un AFN usando el algoritmo de subconjuntos.
+    Los ids y el buffer de ε-cierres salen de ctx (uno nuevo si es None).
+    Lanza AFDDemasiadoGrande si el AFD pasa de max_estados estados.
     Retorna: (estado_inicial, lista_de_estados)
     """
-    from .draw import _recolectar_estados  # import local para evitar ciclos
+    if ctx is None:
+        ctx = ContextoCompilacion()
+    cierres = ctx.cierres
 
     # 1. recolectar todos los estados del AFN
-    nfa_states = _recolectar_estados(afn_fragment.start)
+    nfa_states = recolectar_estados(afn_fragment.start)
 
     # 2. alfabeto (sin ε)
     alphabet = set()
@@ -42,9 +94,13 @@ def construir_afd_desde_afn(afn_fragment):
             if sym != 'ε':
                 alphabet.add(sym)
 
+    if afn_fragment.contadores:
+        start_set, mover_, cierre, acepta = _por_configuraciones(afn_fragment)
+    else:
+        start_set, mover_, cierre, acepta = _por_estados(afn_fragment)
+
     # 3. estado inicial del AFD
-    start_set = epsilon_cierre({afn_fragment.start})
-    start_dfa = DFAState(start_set, is_accept=bool(afn_fragment.accepts & start_set))
+    start_dfa = DFAState(ctx, start_set, is_accept=acepta(start_set))
 
     dfa_states = {start_dfa}
     worklist = [start_dfa]
@@ -54,20 +110,25 @@ def construir_afd_desde_afn(afn_fragment):
     while worklist:
         current = worklist.pop()
         for sym in alphabet:
-            move_set = mover(current.nfa_states, sym)
-            closure = epsilon_cierre(move_set)
-            if not closure:
+            move_set = frozenset(mover_(current.nfa_states, sym))
+            if not move_set:
                 continue
-            is_accept = bool(afn_fragment.accepts & closure)
-            closure_frozen = frozenset(closure)
+            closure_frozen = cierres.get(move_set)
+            if closure_frozen is None:
+                closure_frozen = frozenset(cierre(move_set))
+                cierres[move_set] = closure_frozen
             if closure_frozen not in dfa_map:
-                new_dfa = DFAState(closure, is_accept=is_accept)
+                if len(dfa_states) >= max_estados:
+                    ctx.limpiar_buffers()
+                    raise AFDDemasiadoGrande(f"El AFD pasa de {max_estados} estados")
+                new_dfa = DFAState(ctx, closure_frozen, is_accept=acepta(closure_frozen))
                 dfa_map[closure_frozen] = new_dfa
                 dfa_states.add(new_dfa)
                 worklist.append(new_dfa)
             current.edges[sym] = dfa_map[closure_frozen]
 
+    ctx.limpiar_buffers()
     return start_dfa, list(dfa_states)
 
 
-__all__ = ["DFAState", "construir_afd_desde_afn"]
+__all__ = ["DFAState", "construir_afd_desde_afn", "AFDDemasiadoGrande", "MAX_ESTADOS_AFD"]
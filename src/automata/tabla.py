@@ -0,0 +1,56 @@
+"""
+Tabla de transiciones de un AFD con símbolos numerados.
+Los estados y símbolos se numeran con enteros y las transiciones se
+guardan en una lista plana: transiciones[estado * ancho + id_simbolo].
+El último id (desconocido) corresponde a cualquier símbolo fuera del
+alfabeto y siempre lleva al estado muerto (-1).
+"""
+
+from collections import deque
+
+
+class TablaAFD:
+    def __init__(self, start):
+        # numerar estados en orden BFS (el inicial es 0)
+        numeros = {start: 0}
+        orden = [start]
+        cola = deque([start])
+        while cola:
+            s = cola.popleft()
+            for d in s.edges.values():
+                if d not in numeros:
+                    numeros[d] = len(orden)
+                    orden.append(d)
+                    cola.append(d)
+
+        alfabeto = sorted({sym for s in orden for sym in s.edges})
+        self.simbolos = {sym: i for i, sym in enumerate(alfabeto)}
+        self.desconocido = len(alfabeto)
+        self.ancho = len(alfabeto) + 1
+        self.transiciones = [-1] * (len(orden) * self.ancho)
+        for s in orden:
+            base = numeros[s] * self.ancho
+            for sym, d in s.edges.items():
+                self.transiciones[base + self.simbolos[sym]] = numeros[d]
+        self.aceptacion = [s.is_accept for s in orden]
+
+    def avanzar(self, estado: int, ids) -> int:
+        """
+        Consume los ids desde 'estado' y retorna el estado alcanzado
+        (-1 si se llegó al estado muerto).
+        """
+        transiciones, ancho = self.transiciones, self.ancho
+        for i in ids:
+            estado = transiciones[estado * ancho + i]
+            if estado < 0:
+                return -1
+        return estado
+
+    def acepta_estado(self, estado: int) -> bool:
+        return estado >= 0 and self.aceptacion[estado]
+
+    def coincide_ids(self, ids) -> bool:
+        """
+        Simula el AFD sobre una secuencia (o generador) de ids.
+        """
+        return self.acepta_estado(self.avanzar(0, ids))
@@ -7,10 +7,31 @@ Notas:
 - Las hojas del árbol pueden ser literales como 'a', 'if', 'else', 'ε', '\{', '\}', '\(' ...
 - Durante la construcción des-escapamos: '\{' -> '{', '\}' -> '}', '\?' -> '?', '\.' -> '.', etc.
 - 'ε' se interpreta como transición epsilon (None).
+- Con capturas=True cada grupo k (ver Nodo.grupos) queda entre dos
+  estados que guardan la posición en las ranuras 2k y 2k+1; las
+  transiciones epsilon van en orden de prioridad (primero la rama
+  izquierda de '|' y la iteración en '*', '+', '?').
+- A{m,n}: si las copias de A suman a lo sumo MAX_ESTADOS_EXPANSION
+  estados (o ctx.max_estados_expansion) se construye A una vez y se
+  clona (sin volver a recorrer el subárbol); si no, se usa un solo A con
+  un Contador, que simula acepta_conteo (no se construye AFD). El tamaño
+  se estima desde el árbol, así que no depende de capturas.
+- Repeticiones anidadas cuyo producto de cotas pasa de
+  MAX_PRODUCTO_COTAS se rechazan: la simulación tendría que seguir
+  todas las combinaciones de iteraciones.
 """
 
-from .state import State
+from lexer.tokenizer import es_cota, parsear_cota
+from .state import State, Contador
 from .fragment import Fragment
+from .contexto import ContextoCompilacion
+
+# una repetición se expande clonando el fragmento si las copias suman a lo
+# sumo estos estados del AFN; si no, se usa un contador
+MAX_ESTADOS_EXPANSION = 1000
+
+# tope del producto de las cotas de repeticiones anidadas, (A{m,n}){p,q}
+MAX_PRODUCTO_COTAS = 256
 
 
 def _decode_literal(symbol: str):
@@ -31,16 +52,16 @@ def _decode_literal(symbol: str):
     return symbol
 
 
-def _lit(symbol: str) -> Fragment:
+def _lit(symbol: str, ctx) -> Fragment:
     """
     Construye un fragmento para un literal o epsilon.
     """
-    s = State()
-    f = State()
+    s = State(ctx)
+    f = State(ctx)
     decoded = _decode_literal(symbol)
     if decoded is None:
         # transición epsilon
-        s.eps.add(f)
+        s.eps.append(f)
     else:
         # transición con símbolo real (p. ej., '{', '}', 'if', 'else', 'a', ...)
         s.edges.setdefault(decoded, set()).add(f)
@@ -52,54 +73,150 @@ def _concat(a: Fragment, b: Fragment) -> Fragment:
     Concatenación de fragmentos A.B
     """
     for x in a.accepts:
-        x.eps.add(b.start)
+        x.eps.append(b.start)
     return Fragment(a.start, b.accepts)
 
 
-def _alt(a: Fragment, b: Fragment) -> Fragment:
+def _alt(a: Fragment, b: Fragment, ctx) -> Fragment:
     """
     Alternativa (A|B).
     """
-    s = State()
-    f = State()
-    s.eps.update([a.start, b.start])
+    s = State(ctx)
+    f = State(ctx)
+    s.eps.extend([a.start, b.start])
     for x in a.accepts:
-        x.eps.add(f)
+        x.eps.append(f)
     for x in b.accepts:
-        x.eps.add(f)
+        x.eps.append(f)
     return Fragment(s, {f})
 
 
-def _star(a: Fragment) -> Fragment:
+def _star(a: Fragment, ctx) -> Fragment:
     """
     Cierre de Kleene (A*).
     """
-    s = State()
-    f = State()
-    s.eps.update([a.start, f])
+    s = State(ctx)
+    f = State(ctx)
+    s.eps.extend([a.start, f])
     for x in a.accepts:
-        x.eps.update([a.start, f])
+        x.eps.extend([a.start, f])
     return Fragment(s, {f})
 
 
-def _plus(a: Fragment) -> Fragment:
+def _plus(a: Fragment, ctx) -> Fragment:
     """
     Uno o más (A+): A concatenado con A*
     """
-    return _concat(a, _star(a))
+    return _concat(a, _star(a, ctx))
 
 
-def _optional(a: Fragment) -> Fragment:
+def _optional(a: Fragment, ctx) -> Fragment:
     """
     Cero o uno (A?): A | ε
     """
-    return _alt(a, _lit('ε'))
+    return _alt(a, _lit('ε', ctx), ctx)
+
+
+def _clonar(a: Fragment, ctx) -> Fragment:
+    """
+    Copia los estados de un fragmento todavía sin enlazar (todo lo
+    alcanzable desde a.start pertenece al fragmento).
+    """
+    copia = {}
+    pila = [a.start]
+    while pila:
+        s = pila.pop()
+        if s in copia:
+            continue
+        copia[s] = State(ctx)
+        for dests in s.edges.values():
+            pila.extend(dests)
+        pila.extend(s.eps)
+        pila.extend(d for d, _, _ in s.eps_cont)
+    for s, c in copia.items():
+        for sym, dests in s.edges.items():
+            c.edges[sym] = {copia[d] for d in dests}
+        c.eps = [copia[d] for d in s.eps]
+        if s.guardar is not None:
+            c.guardar = s.guardar
+        if s.eps_cont:
+            c.eps_cont = [(copia[d], cont, op) for d, cont, op in s.eps_cont]
+    return Fragment(copia[a.start], {copia[x] for x in a.accepts})
+
+
+def _contar(a: Fragment, minimo, maximo, ctx) -> Fragment:
+    """
+    A{minimo,maximo} con un único A y un Contador.
+    """
+    cont = Contador(len(ctx.contadores), minimo, maximo)
+    ctx.contadores.append(cont)
+    s = State(ctx)
+    f = State(ctx)
+    s.eps_cont = [(a.start, cont, 'iniciar')]
+    if minimo == 0:
+        s.eps.append(f)
+    for x in a.accepts:
+        x.eps_cont = list(x.eps_cont) + [(a.start, cont, 'repetir'), (f, cont, 'salir')]
+    return Fragment(s, {f})
 
 
-def construir_afn_desde_arbol(nodo) -> Fragment:
+def _grupo(a: Fragment, k: int, ctx) -> Fragment:
+    """
+    Grupo de captura k: guarda la posición al entrar y al salir de A.
+    """
+    abre = State(ctx)
+    abre.guardar = 2 * k
+    abre.eps.append(a.start)
+    cierra = State(ctx)
+    cierra.guardar = 2 * k + 1
+    for x in a.accepts:
+        x.eps.append(cierra)
+    return Fragment(abre, {cierra})
+
+
+def _estados_expandida(minimo, maximo, estados) -> int:
+    """
+    Estados de A{minimo,maximo} expandida si A tiene 'estados' estados:
+    minimo copias, más A* (2 estados más) o maximo - minimo copias
+    opcionales (4 estados más cada una: la alternativa y su ε).
+    """
+    if maximo is None:
+        return minimo * estados + estados + 2
+    return minimo * estados + (maximo - minimo) * (estados + 4)
+
+
+def _repetir(base: Fragment, minimo, maximo, ctx, contador=False) -> Fragment:
+    """
+    Repetición acotada A{minimo,maximo} (maximo None = {minimo,}) a
+    partir del fragmento ya construido de A.
+    """
+    if contador:
+        return _contar(base, minimo, maximo, ctx)
+
+    copias_necesarias = minimo + (1 if maximo is None else maximo - minimo)
+    copias = [base] + [_clonar(base, ctx) for _ in range(copias_necesarias - 1)]
+
+    # A^minimo seguido de A* o de (A(A(...)?)?)? con maximo - minimo copias
+    partes = copias[:minimo]
+    resto = copias[minimo:]
+    if maximo is None:
+        partes.append(_star(resto[0], ctx))
+    elif resto:
+        cola = None
+        for c in reversed(resto):
+            cola = _optional(c if cola is None else _concat(c, cola), ctx)
+        partes.append(cola)
+    resultado = partes[0]
+    for p in partes[1:]:
+        resultado = _concat(resultado, p)
+    return resultado
+
+
+def construir_afn_desde_arbol(nodo, ctx=None, capturas=False) -> Fragment:
     """
     Construye un AFN completo a partir del árbol sintáctico
-    de una expresión regular.
+    de una expresión regular. Los ids de los estados se piden a ctx
+    (si no se pasa, se usa un ContextoCompilacion nuevo).
 
     nodo.valor puede ser:
       - '.'  → concatenación
@@ -107,33 +224,93 @@ def construir_afn_desde_arbol(nodo) -> Fragment:
       - '*'  → estrella de Kleene
       - '+'  → uno o más
       - '?'  → cero o uno
+      - '{m,n}', '{m}', '{m,}' → repetición acotada
       - literal (a, b, if, else, \{, \}, ε, etc.)
+    Si se usaron contadores quedan en el atributo contadores del AFN.
+    Con capturas=True se agregan los estados que guardan los grupos.
     """
-    if nodo is None:
-        return _lit('ε')
+    if ctx is None:
+        ctx = ContextoCompilacion()
+    antes = len(ctx.contadores)
+    afn = _construir(nodo, ctx, capturas)
+    afn.contadores = tuple(ctx.contadores[antes:])
+    return afn
 
-    v = nodo.valor
 
-    # caso hoja (literal/ε)
-    if nodo.izquierda is None and nodo.derecha is None:
-        return _lit(v)
-
-    # caso operador
-    if v == '.':
-        return _concat(
-            construir_afn_desde_arbol(nodo.izquierda),
-            construir_afn_desde_arbol(nodo.derecha)
-        )
-    elif v == '|':
-        return _alt(
-            construir_afn_desde_arbol(nodo.izquierda),
-            construir_afn_desde_arbol(nodo.derecha)
-        )
-    elif v == '*':
-        return _star(construir_afn_desde_arbol(nodo.izquierda))
+def _construir(nodo, ctx, capturas=False) -> Fragment:
+    """
+    Construcción de Thompson en postorden con una pila explícita (sin
+    recursión, así que la profundidad del árbol no tiene límite). Los
+    estados se crean en el mismo orden que en el recorrido recursivo:
+    primero el subárbol izquierdo, después el derecho y al final el
+    operador.
+    """
+    # resultados: (fragmento, estados estimados sin grupos, producto de
+    # las cotas de las repeticiones anidadas)
+    resultados = []
+    pila = [(nodo, False)]
+    while pila:
+        actual, listo = pila.pop()
+        if actual is None:
+            resultados.append((_lit('ε', ctx), 2, 1))
+            continue
+        v = actual.valor
+        if listo:
+            a = _operador(actual, resultados, ctx)
+        elif actual.izquierda is None and actual.derecha is None:
+            # caso hoja (literal/ε)
+            a = (_lit(v, ctx), 2, 1)
+        elif es_cota(v) and parsear_cota(v)[1] == 0:
+            # A{0} / A{0,0}: A no se construye
+            a = (_lit('ε', ctx), 2, 1)
+        else:
+            pila.append((actual, True))
+            if v in {'.', '|'}:
+                pila.append((actual.derecha, False))
+            pila.append((actual.izquierda, False))
+            continue
+        if capturas:
+            # actual.grupos va de afuera hacia adentro
+            fragmento = a[0]
+            for k in reversed(actual.grupos):
+                fragmento = _grupo(fragmento, k, ctx)
+            a = (fragmento,) + a[1:]
+        resultados.append(a)
+    return resultados.pop()[0]
+
+
+def _operador(nodo, resultados, ctx):
+    """
+    Aplica el operador de nodo a los fragmentos de sus hijos, que están
+    al final de resultados (el derecho arriba). Retorna la misma terna
+    que guarda resultados.
+    """
+    v = nodo.valor
+    if v in {'.', '|'}:
+        der, estados_der, producto_der = resultados.pop()
+        izq, estados_izq, producto_izq = resultados.pop()
+        producto = max(producto_izq, producto_der)
+        if v == '.':
+            return _concat(izq, der), estados_izq + estados_der, producto
+        return _alt(izq, der, ctx), estados_izq + estados_der + 2, producto
+    a, estados, producto = resultados.pop()
+    if v == '*':
+        return _star(a, ctx), estados + 2, producto
     elif v == '+':
-        return _plus(construir_afn_desde_arbol(nodo.izquierda))
+        return _plus(a, ctx), estados + 2, producto
     elif v == '?':
-        return _optional(construir_afn_desde_arbol(nodo.izquierda))
+        return _optional(a, ctx), estados + 4, producto
+    elif es_cota(v):
+        minimo, maximo = parsear_cota(v)
+        cota = max(1, minimo if maximo is None else maximo)
+        if producto > 1 and producto * cota > MAX_PRODUCTO_COTAS:
+            raise ValueError(f"Repeticiones anidadas demasiado grandes: {v} sobre un "
+                             f"subpatrón con producto de cotas {producto} (máximo "
+                             f"{MAX_PRODUCTO_COTAS})")
+        expandida = _estados_expandida(minimo, maximo, estados)
+        limite = ctx.max_estados_expansion
+        if expandida > (MAX_ESTADOS_EXPANSION if limite is None else limite):
+            return _repetir(a, minimo, maximo, ctx, contador=True), estados + 2, producto * cota
+        return _repetir(a, minimo, maximo, ctx), expandida, producto * cota
 
     raise ValueError(f"Operador no soportado en árbol: {v}")
@@ -0,0 +1,279 @@
+"""
+Autoprueba de las piezas que el fuzzing diferencial no cubre: cada
+chequeo es chico, no dibuja ni escribe fuera de un directorio temporal
+y devuelve la lista de fallas encontradas.
+  - manifiesto: cambiar la versión o la cadena invalida lo guardado,
+    faltar una imagen obliga a redibujar y un patrón sin AFD no espera
+    imágenes de AFD
+  - equivalencia: equivalentes / incluido / interseccion_vacia sobre
+    pares de respuesta conocida, con contraejemplos que de verdad
+    distinguen; AFD ≡ AFDmin y contadores ≡ expansión
+  - servicio: el protocolo de JSON por líneas sobre un socket real
+    (ids, errores, caché negativa)
+  - conjunto: ConjuntoPatrones contra cada patrón compilado por separado
+    al agregar y quitar, también el AFD minimizado
+Termina con código 1 si algún chequeo falla, así que sirve como prueba
+de regresión junto a fuzz_diferencial y tiempo_import.
+
+Uso (desde src/):
+    python -m herramientas.autoprueba
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+from lexer.tokenizer import tokenizar_cadena
+from automata.conjunto import ConjuntoPatrones
+from automata.contexto import ContextoCompilacion
+from automata.equivalencia import equivalentes, incluido, interseccion_vacia
+from automata.simulate import acepta_afd
+from servicio.servidor import ServicioCoincidencias
+from utils import manifiesto
+from utils.compilar import arbol_regex, compilar_patron
+from utils.io import _planificar
+from utils.manifiesto import Manifiesto, archivos_patron, hash_caso
+
+# (a, b, L(a) = L(b), L(a) ⊆ L(b), L(a) ∩ L(b) = ∅)
+PARES = [
+    ("(a|b)*", "(a*b*)*", True, True, False),
+    ("a*", "a+", False, False, False),
+    ("a+", "a*", False, True, False),
+    ("a+", "b+", False, False, True),
+    ("(a|b)*abb", "(a|b)*b", False, True, False),
+    ("a{2,4}", "aa|aaa|aaaa", True, True, False),
+    ("(ab){3}", "ababab", True, True, False),
+    ("a{0,3}b", "a?a?a?b", True, True, False),
+    ("(a|b){2}c", "(a|b)(a|b)c?", False, True, False),
+]
+
+# patrones con repeticiones: el AFD por contadores debe aceptar lo mismo
+# que el de la expansión
+CONTADORES = ["a{2,40}", "(ab|c){1,30}", "(a|b)*a(a|b){5}", "(a{2,3}b){2,}", "a{0,600}"]
+
+CONJUNTO = {"abb": "(a|b)*abb", "as": "a+", "par": "(aa|bb)*", "fin_c": "(a|b|c)*c", "if": "if"}
+
+
+def _w(simbolos) -> str:
+    # los pares solo usan letras sueltas: la cadena es la unión de los símbolos
+    return ''.join(simbolos)
+
+
+def _chequear_manifiesto() -> list[str]:
+    fallas = []
+    with tempfile.TemporaryDirectory() as directorio:
+        r, w = "(a|b)*abb", "aabb"
+        h = hash_caso(r, w)
+        original = manifiesto.VERSION_PIPELINE
+        try:
+            manifiesto.VERSION_PIPELINE = original + 1
+            if hash_caso(r, w) == h:
+                fallas.append("hash_caso no depende de VERSION_PIPELINE")
+        finally:
+            manifiesto.VERSION_PIPELINE = original
+        if hash_caso(r, w + "a") == h or hash_caso(r + "a", w) == h:
+            fallas.append("hash_caso no depende de la regex o de la cadena")
+
+        info = {"linea": 1, "resumen": [], "afd": True, "archivos": archivos_patron(1, True)}
+        guardado = Manifiesto(directorio, {r: info}, {h: {"AFN": True}})
+        guardado.guardar()
+        cargado = Manifiesto.cargar(directorio)
+        if cargado.patrones != guardado.patrones or cargado.casos != guardado.casos:
+            fallas.append("guardar + cargar no devuelve el mismo manifiesto")
+
+        ruta = os.path.join(directorio, manifiesto.NOMBRE)
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        datos["version"] = manifiesto.VERSION_PIPELINE - 1
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        if Manifiesto.cargar(directorio).patrones:
+            fallas.append("un manifiesto de otra versión no se descarta")
+
+        for nombre in info["archivos"]:
+            open(os.path.join(directorio, nombre), 'w').close()
+        primeras = {r: 1}
+        a_compilar, a_dibujar = _planificar(guardado, primeras, [(1, r, w)])
+        if a_compilar or a_dibujar:
+            fallas.append(f"sin cambios se recompila {a_compilar} o redibuja {a_dibujar}")
+        a_compilar, a_dibujar = _planificar(guardado, primeras, [(1, r, w), (2, r, "ab")])
+        if a_compilar != {r} or a_dibujar:
+            fallas.append("una cadena nueva no recompila solo ese patrón")
+        os.remove(os.path.join(directorio, info["archivos"][-1]))
+        _, a_dibujar = _planificar(guardado, primeras, [(1, r, w)])
+        if a_dibujar != {r}:
+            fallas.append("falta una imagen y el patrón no se redibuja")
+
+        if any("afd" in a for a in archivos_patron(3, False)):
+            fallas.append("un patrón sin AFD espera imágenes de AFD")
+    return fallas
+
+
+def _chequear_equivalencia() -> list[str]:
+    fallas = []
+    for a, b, igual, dentro, disjuntos in PARES:
+        pa, pb = compilar_patron(a), compilar_patron(b)
+        for nombre, decidir, esperado, distingue in (
+            ("equivalentes", equivalentes, igual,
+             lambda w: pa.coincide(w) != pb.coincide(w)),
+            ("incluido", incluido, dentro,
+             lambda w: pa.coincide(w) and not pb.coincide(w)),
+            ("interseccion_vacia", interseccion_vacia, disjuntos,
+             lambda w: pa.coincide(w) and pb.coincide(w)),
+        ):
+            # se prueban el AFN y el AFDmin como entrada
+            for x, y in ((pa.afn, pb.afn), (pa.start_min, pb.start_min)):
+                ok, contraejemplo = decidir(x, y)
+                if ok != esperado:
+                    fallas.append(f"{nombre}({a!r}, {b!r}) = {ok}, se esperaba {esperado}")
+                elif not ok and not distingue(_w(contraejemplo)):
+                    fallas.append(f"{nombre}({a!r}, {b!r}): el contraejemplo "
+                                  f"{contraejemplo} no distingue")
+        for p in (pa, pb):
+            ok, contraejemplo = p.verificar()
+            if not ok:
+                fallas.append(f"AFD ≢ AFDmin para {p.regex!r} (contraejemplo {contraejemplo})")
+
+    for r in CONTADORES:
+        expandido = compilar_patron(r)
+        conteo = compilar_patron(r, ContextoCompilacion(0))
+        if not conteo.conteo:
+            fallas.append(f"{r!r} no usa contadores con max_estados_expansion=0")
+        ok, contraejemplo = equivalentes(expandido.start_min, conteo.start_min)
+        if not ok:
+            fallas.append(f"contadores ≢ expansión para {r!r} (contraejemplo {contraejemplo})")
+    return fallas
+
+
+async def _conversar(peticiones):
+    """
+    Envía las peticiones por una conexión TCP a un servicio propio y
+    devuelve (respuestas, estadísticas finales del servicio).
+    """
+    servicio = ServicioCoincidencias(capacidad=4)
+    servidor = await servicio.iniciar("127.0.0.1", 0)
+    puerto = servidor.sockets[0].getsockname()[1]
+    try:
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        for p in peticiones:
+            escritor.write((p if isinstance(p, str) else json.dumps(p)).encode('utf-8') + b"\n")
+        await escritor.drain()
+        respuestas = [json.loads(await lector.readline()) for _ in peticiones]
+        escritor.close()
+        await escritor.wait_closed()
+        # que el servicio lea el fin de la conexión antes de cerrarlo
+        while servicio.conexiones:
+            await asyncio.sleep(0.01)
+        return respuestas, servicio.estadisticas()
+    finally:
+        servidor.close()
+        await servidor.wait_closed()
+        servicio.cerrar()
+
+
+def _chequear_servicio() -> list[str]:
+    peticiones = [
+        {"id": 1, "op": "compile", "regex": "(a|b)*abb"},
+        {"id": 2, "op": "match", "regex": "(a|b)*abb", "w": "aabb"},
+        {"id": 3, "op": "match_batch", "regex": "(a|b)*abb", "ws": ["abb", "ab", ""]},
+        {"id": 4, "op": "match", "regex": "(a|b)*a(a|b){14}", "w": "a" * 15},
+        {"id": 5, "op": "compile", "regex": "("},
+        {"id": 6, "op": "match", "regex": "(", "w": "a"},
+        {"id": "x", "op": "otra", "regex": "a"},
+        "{no es json",
+        {"id": 7, "op": "stats"},
+    ]
+    esperadas = [
+        {"id": 1, "ok": True, "en_cache": False},
+        {"id": 2, "ok": True, "resultado": True},
+        {"id": 3, "ok": True, "resultados": [True, False, False]},
+        {"id": 4, "ok": True, "resultado": True},
+        {"id": 5, "ok": False},
+        {"id": 6, "ok": False},
+        {"id": "x", "ok": False},
+        {"id": None, "ok": False},
+        {"id": 7, "ok": True},
+    ]
+    fallas = []
+    respuestas, stats = asyncio.run(_conversar(peticiones))
+    for peticion, respuesta, esperada in zip(peticiones, respuestas, esperadas):
+        if any(respuesta.get(k) != v for k, v in esperada.items()):
+            fallas.append(f"{peticion!r} -> {respuesta!r}")
+    if respuestas[4].get("error") != respuestas[5].get("error"):
+        fallas.append("la regex inválida da errores distintos al repetirse")
+    # compilaciones: (a|b)*abb, el patrón sin límite y '(' una sola vez
+    if stats["fallos"] != 3:
+        fallas.append(f"se compiló {stats['fallos']} veces en lugar de 3 (caché negativa)")
+    return fallas
+
+
+def _chequear_conjunto() -> list[str]:
+    fallas = []
+    patrones = {nombre: compilar_patron(r) for nombre, r in CONJUNTO.items()}
+    cadenas = [''.join(t) for n in range(6) for t in itertools.product("abc", repeat=n)]
+    cadenas += ["if", "iff", "ifa"]
+    conjunto = ConjuntoPatrones()
+
+    def comparar(momento):
+        start_min, _ = conjunto.minimizado()
+        for w in cadenas:
+            tokens = tokenizar_cadena(w)
+            esperado = frozenset(n for n in conjunto_actual if patrones[n].coincide(w))
+            obtenido = conjunto.coincidencias(tokens)
+            actual = start_min
+            for tok in tokens:
+                actual = actual.edges.get(tok) if actual is not None else None
+            minimo = actual.patrones if actual is not None else frozenset()
+            if obtenido != esperado or minimo != esperado:
+                fallas.append(f"{momento}: {w!r} -> {set(obtenido)} / mínimo "
+                              f"{set(minimo)}, se esperaba {set(esperado)}")
+                return
+
+    conjunto_actual = []
+    for nombre, r in CONJUNTO.items():
+        conjunto.agregar(nombre, arbol_regex(r))
+        conjunto_actual.append(nombre)
+        comparar(f"tras agregar {nombre}")
+    for nombre in ("as", "fin_c"):
+        conjunto.quitar(nombre)
+        conjunto_actual.remove(nombre)
+        comparar(f"tras quitar {nombre}")
+    conjunto.compactar()
+    conjunto.agregar("as", arbol_regex(CONJUNTO["as"]))
+    conjunto_actual.append("as")
+    comparar("tras compactar y volver a agregar as")
+
+    try:
+        conjunto.agregar("abb", arbol_regex("a"))
+        fallas.append("agregar un nombre repetido no falla")
+    except ValueError:
+        pass
+    if not acepta_afd(conjunto.minimizado()[0], tokenizar_cadena("aa")):
+        fallas.append("el AFD minimizado no acepta 'aa'")
+    return fallas
+
+
+CHEQUEOS = {
+    "manifiesto": _chequear_manifiesto,
+    "equivalencia": _chequear_equivalencia,
+    "servicio": _chequear_servicio,
+    "conjunto": _chequear_conjunto,
+}
+
+
+def main():
+    total = 0
+    for nombre, chequear in CHEQUEOS.items():
+        fallas = chequear()
+        total += len(fallas)
+        print(f"{nombre:<14}{'ok' if not fallas else f'{len(fallas)} fallas'}")
+        for falla in fallas[:10]:
+            print(f"  {falla}")
+    sys.exit(1 if total else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark del parser: compara la cadena clásica de seis pasadas
+(expandir_clases, expandir_operadores, tokenize,
+insertar_concatenaciones_tokens, shunting_yard, construir_arbol) con el
+parser descendente de una sola pasada, en patrones de 100k+ caracteres.
+
+Uso (desde src/):
+    python -m herramientas.bench_parser [tamaño ...]
+"""
+
+import sys
+import time
+
+from lexer.tokenizer import (
+    expandir_clases,
+    expandir_operadores,
+    insertar_concatenaciones_tokens,
+    tokenize,
+)
+from lexer.shunting_yard import shunting_yard
+from regex_tree.parser import construir_arbol
+from regex_tree.descendente import parsear_regex
+
+# bloques que se repiten hasta alcanzar el tamaño pedido
+BLOQUES = {
+    "literales": "abcxyz",
+    "clases": "[abc]x[xyz]",
+    "operadores": "(a|b)+c?d*",
+    "palabras": "if\\((a|x|t)+\\)\\{y\\}(else\\{n\\})?",
+}
+
+
+def _cadena_clasica(r: str):
+    expandida = expandir_operadores(expandir_clases(r))
+    tokens = insertar_concatenaciones_tokens(tokenize(expandida))
+    return construir_arbol(shunting_yard(tokens))
+
+
+def _medir(funcion, r: str) -> float:
+    inicio = time.perf_counter()
+    funcion(r)
+    return time.perf_counter() - inicio
+
+
+def main(tamanos):
+    print(f"{'patrón':<12}{'tamaño':>10}{'6 pasadas (s)':>16}{'descendente (s)':>18}{'x':>8}")
+    for nombre, bloque in BLOQUES.items():
+        for tamano in tamanos:
+            r = bloque * (tamano // len(bloque) + 1)
+            # cortar en un límite de bloque para que la regex siga siendo válida
+            r = r[:len(bloque) * (tamano // len(bloque))]
+            t_clasica = _medir(_cadena_clasica, r)
+            t_nueva = _medir(parsear_regex, r)
+            print(f"{nombre:<12}{len(r):>10}{t_clasica:>16.3f}{t_nueva:>18.3f}"
+                  f"{t_clasica / t_nueva:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [25_000, 50_000, 100_000, 200_000])
@@ -0,0 +1,95 @@
+"""
+Generador de carga para servicio.servidor: abre varias conexiones
+concurrentes, envía peticiones 'match' y mide peticiones por segundo y
+latencias (p50, p99).
+
+Uso (desde src/):
+    python -m herramientas.carga_servicio [--puerto 8765 | --unix RUTA]
+        [--conexiones 200] [--peticiones 50] [--local]
+
+Con --local se levanta el servicio en el mismo proceso (útil para una
+medición rápida); sin él se conecta a un servidor ya iniciado.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from servicio.servidor import ServicioCoincidencias
+
+PATRONES = [
+    "(a|b)*abb",
+    "if\\((a|x|t)+\\)\\{y\\}(else\\{n\\})?",
+    "\\?(((=|ε)?!?))+",
+    "[abc]*a[abc][abc]",
+]
+
+
+def _cadena(rng) -> str:
+    return ''.join(rng.choice("abcxt") for _ in range(rng.randint(0, 30)))
+
+
+async def _cliente(args, semilla, latencias):
+    rng = random.Random(semilla)
+    if args.unix:
+        lector, escritor = await asyncio.open_unix_connection(args.unix)
+    else:
+        lector, escritor = await asyncio.open_connection(args.host, args.puerto)
+    try:
+        for i in range(args.peticiones):
+            peticion = {"id": i, "op": "match",
+                        "regex": rng.choice(PATRONES), "w": _cadena(rng)}
+            inicio = time.perf_counter()
+            escritor.write(json.dumps(peticion).encode('utf-8') + b"\n")
+            await escritor.drain()
+            respuesta = json.loads(await lector.readline())
+            latencias.append(time.perf_counter() - inicio)
+            if not respuesta.get("ok"):
+                raise RuntimeError(respuesta.get("error"))
+    finally:
+        escritor.close()
+
+
+def _percentil(valores, p):
+    k = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return valores[k]
+
+
+async def _medir(args):
+    servicio = servidor = None
+    if args.local:
+        servicio = ServicioCoincidencias()
+        servidor = await servicio.iniciar(args.host, args.puerto, args.unix)
+    try:
+        latencias = []
+        inicio = time.perf_counter()
+        await asyncio.gather(*(_cliente(args, n, latencias) for n in range(args.conexiones)))
+        total = time.perf_counter() - inicio
+    finally:
+        if servidor is not None:
+            servidor.close()
+            await servidor.wait_closed()
+            servicio.cerrar()
+
+    latencias.sort()
+    print(f"peticiones : {len(latencias)} en {total:.2f} s")
+    print(f"req/s      : {len(latencias) / total:.0f}")
+    print(f"p50        : {_percentil(latencias, 50) * 1000:.2f} ms")
+    print(f"p99        : {_percentil(latencias, 99) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga del servicio de coincidencias")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--unix", default=None)
+    parser.add_argument("--conexiones", type=int, default=200)
+    parser.add_argument("--peticiones", type=int, default=50, help="peticiones por conexión")
+    parser.add_argument("--local", action="store_true", help="iniciar el servicio en este proceso")
+    asyncio.run(_medir(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
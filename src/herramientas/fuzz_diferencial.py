@@ -0,0 +1,485 @@
+"""
+Fuzzing diferencial y comparación de rendimiento contra el módulo re.
+
+Genera expresiones aleatorias dentro de la gramática que acepta el
+proyecto, las traduce a un patrón equivalente de re y produce cadenas
+que coinciden (muestreadas del propio árbol) y que no coinciden
+(aleatorias y mutaciones). Para cada cadena exige que coincidan:
+  - acepta sobre el AFN
+  - acepta_afd sobre el AFD de subconjuntos
+  - acepta_afd sobre el AFDmin
+  - la tabla del AFDmin con el tokenizador trie (PatronCompilado.coincide)
+  - el AFD sobre bytes UTF-8 (PatronCompilado.coincide_bytes)
+  - el matcher generado (PatronCompilado.matcher)
+  - la evaluación por fragmentos (PatronCompilado.flujo)
+  - el mismo patrón compilado con todas las repeticiones por contador
+    (ver --max-estados-expansion), simulado con acepta_conteo y con la
+    tabla de su AFD de configuraciones
+  - re.fullmatch (referencia)
+y, cuando la cadena coincide, que PatronCompilado.grupos (máquina de
+Pike) capture lo mismo que los grupos de re, también con contadores.
+
+El generador incluye cuantificadores anidados, cuantificadores sobre
+subexpresiones anulables y palabras reservadas (if, else):
+  - con palabras reservadas el proyecto tokeniza distinto que re (una
+    corrida de letras que no es palabra se parte por carácter), así que
+    esos casos comparan los motores entre sí, sin re
+  - re puede hacer backtracking exponencial; cada llamada a re tiene un
+    tope de TOPE_RE segundos y, si se pasa, esa cadena se compara solo
+    entre los motores del proyecto
+  - cuando un cuantificador itera algo anulable, re deja el grupo en ''
+    (hace una última iteración vacía); ahí las capturas se comparan
+    solo entre los dos AFN con grupos
+Los motores que necesitan AFD se saltean si el patrón no tiene AFD
+(pasa de MAX_ESTADOS_AFD estados).
+Después reporta coincidencias por segundo de cada motor.
+
+Todo es determinista (semilla fija) y no usa red, así que sirve como
+prueba de regresión: termina con código 1 si algún motor discrepa. Un
+caso (compilar y evaluar sus cadenas) que pasa de --tope segundos se
+saltea y se informa, para que la prueba siempre termine.
+
+Uso (desde src/):
+    python -m herramientas.fuzz_diferencial [--semilla 0] [--regex 300] [--cadenas 40]
+                                            [--max-estados-expansion 0] [--tope 10]
+"""
+
+import argparse
+import random
+import re
+import signal
+import sys
+import time
+from contextlib import contextmanager
+
+from lexer.tokenizer import tokenizar_cadena
+from automata.contexto import ContextoCompilacion
+from automata.simulate import acepta, acepta_afd
+from automata.thompson import MAX_PRODUCTO_COTAS
+from utils.compilar import compilar_patron
+
+# Letras que no forman palabras reservadas; las palabras van aparte.
+LETRAS = "abc"
+OTROS = "01"
+ESCAPADOS = "{}?("
+ALFABETO_ENTRADA = LETRAS + OTROS + ESCAPADOS
+PALABRAS = ("if", "else")
+# fichas para las cadenas de los casos con palabras: también letras
+# sueltas de las palabras, para formar corridas como 'ifa' o 'els'
+FICHAS_PALABRAS = tuple(ALFABETO_ENTRADA) + PALABRAS + ("i", "f", "e", "l", "s")
+# segundos por llamada a re
+TOPE_RE = 0.2
+# cadenas más largas se descartan (re puede tardar exponencialmente al fallar)
+MAX_LARGO = 16
+# cotas grandes: por encima del umbral fijo que se usaba antes (16)
+MIN_COTA_GRANDE, MAX_COTA_GRANDE = 17, 40
+
+
+def _generar(rng, profundidad=0):
+    """
+    Árbol aleatorio como tuplas: ('lit', c), ('esc', c), ('eps',),
+    ('clase', chars), ('pal', palabra), ('cat', a, b), ('alt', a, b), ('*'|'+'|'?', a),
+    ('rep', a, m, n) con n None para {m,}. Algunas cotas son grandes
+    (a veces anidadas), sin pasar de MAX_PRODUCTO_COTAS.
+    """
+    r = rng.random()
+    if profundidad > 4 or r < 0.3:
+        h = rng.random()
+        if h < 0.06:
+            return ('pal', rng.choice(PALABRAS))
+        if h < 0.6:
+            return ('lit', rng.choice(LETRAS + OTROS))
+        if h < 0.75:
+            return ('esc', rng.choice(ESCAPADOS))
+        if h < 0.85:
+            return ('eps',)
+        return ('clase', ''.join(rng.sample(LETRAS + OTROS, rng.randint(1, 3))))
+    if r < 0.6:
+        return ('cat', _generar(rng, profundidad + 1), _generar(rng, profundidad + 1))
+    if r < 0.8:
+        return ('alt', _generar(rng, profundidad + 1), _generar(rng, profundidad + 1))
+    # también cuantificadores anidados y sobre anulables ((a*)+, (ε|b)*):
+    # re puede tardar exponencialmente, por eso TOPE_RE
+    sub = _generar(rng, profundidad + 1)
+    op = rng.choice('*+?{')
+    if op == '{':
+        producto = _producto_cotas(sub)
+        if rng.random() < 0.3 and producto * MAX_COTA_GRANDE <= MAX_PRODUCTO_COTAS:
+            minimo = rng.randint(0, 2)
+            maximo = rng.randint(MIN_COTA_GRANDE, MAX_COTA_GRANDE)
+            return ('rep', sub, minimo, maximo)
+        minimo = rng.randint(0, 3)
+        maximo = rng.choice([minimo, minimo + rng.randint(1, 2), None])
+        if producto > 1 and producto * max(1, minimo if maximo is None else maximo) \
+                > MAX_PRODUCTO_COTAS:
+            return sub
+        return ('rep', sub, minimo, maximo)
+    return (op, sub)
+
+
+def _producto_cotas(n) -> int:
+    """
+    Producto de las cotas de las repeticiones anidadas (como lo calcula
+    automata.thompson).
+    """
+    t = n[0]
+    if t in {'cat', 'alt'}:
+        return max(_producto_cotas(n[1]), _producto_cotas(n[2]))
+    if t in {'*', '+', '?'}:
+        return _producto_cotas(n[1])
+    if t == 'rep':
+        return max(1, n[2] if n[3] is None else n[3]) * _producto_cotas(n[1])
+    return 1
+
+
+def _anulable(n) -> bool:
+    t = n[0]
+    if t == 'eps' or t in {'*', '?'}:
+        return True
+    if t == 'cat':
+        return _anulable(n[1]) and _anulable(n[2])
+    if t == 'alt':
+        return _anulable(n[1]) or _anulable(n[2])
+    if t in {'+', 'rep'}:
+        return (t == 'rep' and n[2] == 0) or _anulable(n[1])
+    return False
+
+
+def _itera_anulable(n) -> bool:
+    """
+    True si algún *, + o {m,n} itera algo anulable. Ahí re hace una
+    última iteración vacía que deja el grupo en '' y la simulación de
+    Pike (como RE2) conserva la última no vacía, así que las capturas
+    se comparan solo entre motores propios.
+    """
+    t = n[0]
+    if t in {'*', '+'} or (t == 'rep' and n[3] != 1):
+        if _anulable(n[1]):
+            return True
+    if t in {'cat', 'alt'}:
+        return _itera_anulable(n[1]) or _itera_anulable(n[2])
+    if t in {'*', '+', '?', 'rep'}:
+        return _itera_anulable(n[1])
+    return False
+
+
+def _usa_palabras(n) -> bool:
+    if n[0] == 'pal':
+        return True
+    return any(_usa_palabras(h) for h in n[1:] if isinstance(h, tuple))
+
+
+def _a_regex(n, rng) -> str:
+    """
+    Texto del árbol en la sintaxis del proyecto.
+    """
+    t = n[0]
+    if t == 'lit':
+        return n[1]
+    if t == 'pal':
+        # entre paréntesis: pegada a otras letras ('ifa', 'ifelse') o
+        # seguida de '+'/'?' ('if+' = i.f+) dejaría de ser la palabra
+        return f'({n[1]})'
+    if t == 'esc':
+        return '\\' + n[1]
+    if t == 'eps':
+        return 'ε'
+    if t == 'clase':
+        return '[' + n[1] + ']'
+    if t == 'cat':
+        izq, der = _a_regex(n[1], rng), _a_regex(n[2], rng)
+        if n[1][0] == 'alt':
+            izq = f'({izq})'
+        if n[2][0] == 'alt':
+            der = f'({der})'
+        return izq + ('.' if rng.random() < 0.2 else '') + der
+    if t == 'alt':
+        return _a_regex(n[1], rng) + '|' + _a_regex(n[2], rng)
+    sub = _a_regex(n[1], rng)
+    if n[1][0] not in {'lit', 'pal', 'esc', 'eps', 'clase'}:
+        sub = f'({sub})'
+    return sub + _operador(n)
+
+
+def _operador(n) -> str:
+    if n[0] != 'rep':
+        return n[0]
+    minimo, maximo = n[2], n[3]
+    if maximo == minimo:
+        return f'{{{minimo}}}'
+    return f'{{{minimo},{"" if maximo is None else maximo}}}'
+
+
+def _a_re(n, grupos=False) -> str:
+    """
+    Patrón equivalente para el módulo re. Con grupos=True los paréntesis
+    que escribe _a_regex son grupos de captura (con la misma numeración).
+    """
+    t = n[0]
+    if t in {'lit', 'esc'}:
+        return re.escape(n[1])
+    if t == 'pal':
+        return _envolver(n[1], grupos)
+    if t == 'eps':
+        return '(?:)'
+    if t == 'clase':
+        return '[' + ''.join(re.escape(c) for c in n[1]) + ']'
+    if t == 'cat':
+        izq = _envolver(_a_re(n[1], grupos), grupos and n[1][0] == 'alt')
+        der = _envolver(_a_re(n[2], grupos), grupos and n[2][0] == 'alt')
+        return izq + der
+    if t == 'alt':
+        return f'(?:{_a_re(n[1], grupos)}|{_a_re(n[2], grupos)})'
+    grupo = grupos and n[1][0] not in {'lit', 'esc', 'eps', 'clase'}
+    return _envolver(_a_re(n[1], grupos), grupo) + _operador(n)
+
+
+def _envolver(patron: str, grupo: bool) -> str:
+    return f'({patron})' if grupo else f'(?:{patron})'
+
+
+def _muestra(n, rng) -> str:
+    """
+    Cadena aleatoria del lenguaje del árbol.
+    """
+    t = n[0]
+    if t in {'lit', 'pal', 'esc'}:
+        return n[1]
+    if t == 'eps':
+        return ''
+    if t == 'clase':
+        return rng.choice(n[1])
+    if t == 'cat':
+        return _muestra(n[1], rng) + _muestra(n[2], rng)
+    if t == 'alt':
+        return _muestra(n[rng.randint(1, 2)], rng)
+    if t == 'rep':
+        # con cotas grandes casi siempre pasaría de MAX_LARGO
+        veces = rng.randint(n[2], n[2] + 2 if n[3] is None else min(n[3], n[2] + 4))
+    else:
+        veces = {'*': rng.randint(0, 3), '+': rng.randint(1, 3), '?': rng.randint(0, 1)}[t]
+    return ''.join(_muestra(n[1], rng) for _ in range(veces))
+
+
+def _mutar(w: str, rng, fichas) -> str:
+    if not w or rng.random() < 0.3:
+        return w + rng.choice(fichas)
+    i = rng.randrange(len(w))
+    if rng.random() < 0.5:
+        return w[:i] + w[i + 1:]
+    return w[:i] + rng.choice(fichas) + w[i + 1:]
+
+
+def _cadenas(arbol, rng, cantidad):
+    fichas = FICHAS_PALABRAS if _usa_palabras(arbol) else ALFABETO_ENTRADA
+    ws = []
+    for _ in range(cantidad // 2):
+        w = _muestra(arbol, rng)
+        if len(w) <= MAX_LARGO:
+            ws.append(w)
+    for _ in range(cantidad - len(ws)):
+        if ws and rng.random() < 0.5:
+            ws.append(_mutar(rng.choice(ws), rng, fichas))
+        else:
+            ws.append(''.join(rng.choice(fichas) for _ in range(rng.randint(0, 8))))
+    return ws
+
+
+def _por_fragmentos(patron, w: str) -> bool:
+    flujo = patron.flujo()
+    for i in range(0, len(w), 3):
+        flujo.alimentar(w[i:i + 3])
+    return flujo.terminar()
+
+
+def _motores(patron, conteo, compilado_re):
+    motores = {"AFN": lambda w: acepta(patron.afn, tokenizar_cadena(w))}
+    if patron.tiene_afd:
+        matcher = patron.matcher()
+        motores.update({
+            "AFD": lambda w: acepta_afd(patron.start_dfa, tokenizar_cadena(w)),
+            "AFDmin": lambda w: acepta_afd(patron.start_min, tokenizar_cadena(w)),
+            "codegen": lambda w: matcher(tokenizar_cadena(w)),
+        })
+    motores.update({
+        "tabla": patron.coincide,
+        "bytes": lambda w: patron.coincide_bytes(w.encode('utf-8')),
+        "flujo": lambda w: _por_fragmentos(patron, w),
+        "conteo": lambda w: acepta(conteo.afn, tokenizar_cadena(w)),
+        "conteo_afd": conteo.coincide,
+    })
+    if compilado_re is not None:
+        motores["re"] = lambda w: compilado_re.fullmatch(w) is not None
+    return motores
+
+
+class TiempoAgotado(Exception):
+    pass
+
+
+class ReLento(TiempoAgotado):
+    pass
+
+
+_plazos = []  # pila de (vencimiento, excepción) de los _tope abiertos
+
+
+def _vencido(signum, frame):
+    ahora = time.monotonic()
+    for vence, excepcion in _plazos:  # primero el más externo
+        if ahora >= vence:
+            raise excepcion()
+    _programar()
+
+
+def _programar():
+    if _plazos:
+        resto = min(v for v, _ in _plazos) - time.monotonic()
+        signal.setitimer(signal.ITIMER_REAL, max(resto, 1e-4))
+    else:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+@contextmanager
+def _tope(segundos: float, excepcion=TiempoAgotado):
+    """
+    Lanza excepcion dentro del bloque si tarda más de 'segundos' (con
+    SIGALRM; donde no existe, el bloque corre sin tope). Se puede
+    anidar: vence primero el plazo más cercano.
+    """
+    if not hasattr(signal, "SIGALRM") or segundos <= 0:
+        yield
+        return
+    if not _plazos:
+        signal.signal(signal.SIGALRM, _vencido)
+    _plazos.append((time.monotonic() + segundos, excepcion))
+    _programar()
+    try:
+        yield
+    finally:
+        _plazos.pop()
+        _programar()
+
+
+def _re_con_tope(compilado, w):
+    """
+    re.fullmatch con tope de TOPE_RE segundos. Retorna (terminó, match).
+    """
+    try:
+        with _tope(TOPE_RE, ReLento):
+            return True, compilado.fullmatch(w)
+    except ReLento:
+        return False, None
+
+
+def _probar(arbol, regex, ws, args):
+    """
+    Compila el caso y compara los motores en cada cadena. Retorna
+    (motores, mensajes de discrepancia, cadenas en que re se pasó del
+    tope). Con palabras reservadas no se usa re.
+    """
+    patron = compilar_patron(regex)
+    conteo = compilar_patron(regex, ContextoCompilacion(args.max_estados_expansion))
+    referencia = not _usa_palabras(arbol)
+    motores = _motores(patron, conteo, re.compile(_a_re(arbol)) if referencia else None)
+    con_grupos = re.compile(_a_re(arbol, grupos=True))
+    mensajes = []
+    re_lento = 0
+    for w in ws:
+        resultados = {nombre: m(w) for nombre, m in motores.items() if nombre != "re"}
+        esperado = None
+        if referencia:
+            termino, coincidencia = _re_con_tope(con_grupos, w)
+            if termino:
+                resultados["re"] = coincidencia is not None
+                if coincidencia is not None:
+                    esperado = coincidencia.groups()
+            else:
+                re_lento += 1
+        if len(set(resultados.values())) > 1:
+            mensajes.append(f"DISCREPANCIA regex={regex!r} re={_a_re(arbol)!r} w={w!r}: "
+                            f"{resultados}")
+            continue
+        if not resultados["AFN"]:
+            continue
+        grupos = (patron.grupos(w), conteo.grupos(w))
+        if esperado is None or _itera_anulable(arbol):
+            # sin re: los dos AFN con capturas deben coincidir entre sí
+            esperado = grupos[0]
+        for obtenido in grupos:
+            if obtenido is None or obtenido != esperado:
+                mensajes.append(f"GRUPOS regex={regex!r} re={con_grupos.pattern!r} "
+                                f"w={w!r}: {obtenido} != {esperado}")
+    return motores, mensajes, re_lento
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzing diferencial contra re")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--regex", type=int, default=300, help="expresiones a generar")
+    parser.add_argument("--cadenas", type=int, default=40, help="cadenas por expresión")
+    parser.add_argument("--max-estados-expansion", type=int, default=0,
+                        help="tope de expansión del motor 'conteo' (0 = todas las "
+                             "repeticiones por contador)")
+    parser.add_argument("--tope", type=float, default=10,
+                        help="segundos por caso antes de saltearlo (0 = sin tope)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    casos = []  # (motores, cadenas, re se pasó del tope en alguna)
+    fallos = 0
+    salteados = []
+    re_lento = 0
+    for _ in range(args.regex):
+        arbol = _generar(rng)
+        regex = _a_regex(arbol, rng)
+        ws = _cadenas(arbol, rng, args.cadenas)
+        try:
+            with _tope(args.tope):
+                motores, mensajes, lentas = _probar(arbol, regex, ws, args)
+        except TiempoAgotado:
+            salteados.append(regex)
+            continue
+        re_lento += lentas
+        casos.append((motores, ws, lentas > 0))
+        for mensaje in mensajes:
+            fallos += 1
+            if fallos <= 20:
+                print(mensaje)
+
+    total = sum(len(ws) for _, ws, _ in casos)
+    print(f"{len(casos)} expresiones, {total} cadenas, {fallos} discrepancias (semilla {args.semilla})")
+    sin_re = sum("re" not in motores for motores, _, _ in casos)
+    print(f"{sin_re} expresiones con palabras reservadas (sin re), "
+          f"{re_lento} cadenas en que re pasó de {TOPE_RE} s")
+    if salteados:
+        print(f"{len(salteados)} expresiones salteadas por pasar de {args.tope} s:")
+        for regex in salteados:
+            print(f"  {regex!r}")
+
+    # cada motor se mide sobre los casos que lo tienen (los de AFD no
+    # están si el patrón no tiene AFD) y también re; re, sobre los mismos
+    # casos. Los casos en que re se pasó del tope no se miden.
+    medibles = [(motores, ws) for motores, ws, lento in casos if "re" in motores and not lento]
+    print(f"{'motor':<10}{'coincidencias/s':>18}{'x re':>8}")
+    for nombre in dict.fromkeys(n for motores, _ in medibles for n in motores):
+        tiempos = {}
+        for medido in dict.fromkeys((nombre, "re")):
+            inicio = time.perf_counter()
+            cantidad = 0
+            for motores, ws in medibles:
+                if nombre not in motores:
+                    continue
+                m = motores[medido]
+                for w in ws:
+                    m(w)
+                cantidad += len(ws)
+            tiempos[medido] = time.perf_counter() - inicio
+        t = tiempos[nombre]
+        print(f"{nombre:<10}{cantidad / t:>18.0f}{tiempos['re'] / t:>8.2f}")
+
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
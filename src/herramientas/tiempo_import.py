@@ -0,0 +1,79 @@
+"""
+Presupuesto de tiempo de importación de la API de compilación y
+simulación, medido con python -X importtime.
+
+Cada módulo se importa en un proceso nuevo (varias veces, se toma el
+mínimo) y se compara su tiempo acumulado con el presupuesto. Además se
+exige que no cargue graphviz: los dibujos se importan recién al dibujar.
+Termina con código 1 si algún módulo se pasa del presupuesto o carga un
+módulo prohibido, así que sirve como prueba de regresión.
+
+Uso (desde src/):
+    python -m herramientas.tiempo_import [--repeticiones 5] [--factor 1.0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# módulo -> presupuesto en milisegundos (tiempo acumulado de su import)
+PRESUPUESTOS = {
+    "automata.simulate": 5,
+    "utils.compilar": 15,
+    "utils.io": 20,
+}
+
+PROHIBIDOS = {"graphviz"}
+
+SRC = os.path.join(os.path.dirname(__file__), "..")
+
+
+def _medir(modulo: str):
+    """
+    Importa el módulo en un proceso nuevo. Retorna (milisegundos
+    acumulados, nombres de todos los módulos importados).
+    """
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=SRC, capture_output=True, text=True, check=True)
+    acumulado, importados = None, set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "[us]" in linea:
+            continue
+        _, cumulativo, nombre = linea[len("import time:"):].split("|")
+        importados.add(nombre.strip())
+        if nombre.strip() == modulo and not nombre[1:].startswith(" "):
+            acumulado = int(cumulativo) / 1000
+    return acumulado, importados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de importación")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--factor", type=float, default=1.0,
+                        help="multiplica los presupuestos (máquinas lentas)")
+    args = parser.parse_args()
+
+    fallos = 0
+    print(f"{'módulo':<22}{'ms':>8}{'presupuesto':>14}")
+    for modulo, presupuesto in PRESUPUESTOS.items():
+        _medir(modulo)  # calentar la caché de .pyc
+        mediciones = [_medir(modulo) for _ in range(args.repeticiones)]
+        ms = min(m for m, _ in mediciones)
+        prohibidos = PROHIBIDOS & mediciones[0][1]
+        limite = presupuesto * args.factor
+        estado = "ok"
+        if ms > limite:
+            estado = "EXCEDIDO"
+        if prohibidos:
+            estado = f"carga {', '.join(sorted(prohibidos))}"
+        if estado != "ok":
+            fallos += 1
+        print(f"{modulo:<22}{ms:>8.1f}{limite:>14.1f}  {estado}")
+
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,14 @@ a notación postfix (RPN) usando el algoritmo de Shunting Yard.
 
 from typing import List
 
+from .tokenizer import es_cota
+
 def shunting_yard(tokens: List[str]) -> List[str]:
     """
     Convierte una lista de tokens en notación infix a notación postfix (RPN).
     Tokens válidos:
       - literales (if, else, \{, \}, ε, etc.)
-      - operadores (*, +, ?, ., |)
+      - operadores (*, +, ?, {m,n}, ., |)
       - paréntesis ( )
     """
     salida, pila = [], []
@@ -18,7 +20,14 @@ def shunting_yard(tokens: List[str]) -> List[str]:
     operadores = set(precedencia.keys())
 
     for token in tokens:
-        if token in operadores:
+        if es_cota(token):
+            # cota {m,n}: unario posfijo; se aplica a lo que ya está en la
+            # salida, así que primero salen los unarios pendientes (a*{2})
+            while pila and pila[-1] in {'*', '+', '?'}:
+                salida.append(pila.pop())
+            salida.append(token)
+
+        elif token in operadores:
             if token in {'*', '+', '?'}:  # operadores unarios (derecha-asociativos)
                 while (pila and pila[-1] in operadores and
                        precedencia[token] < precedencia[pila[-1]]):
@@ -6,11 +6,62 @@ Incluye:
 - expandir clases de caracteres [abc] → (a|b|c)
 - insertar concatenaciones explícitas (.)
 - expandir operadores + y ?
+- reconocer cotas de repetición {m}, {m,} y {m,n}
 - tokenizar literales escapados (\{, \}, \?, etc.)
 """
 
 RESERVED_WORDS = {"if", "else", "while", "for"}  # Palabras reservadas válidas
 
+_DIGITOS = '0123456789'
+
+
+def leer_cota(expr: str, i: int):
+    """
+    Si en expr[i] empieza una cota {m}, {m,} o {m,n}, retorna
+    (token, j) con j la posición siguiente a '}'; si no, None
+    (una '{' que no forma cota sigue siendo un literal).
+    """
+    if i >= len(expr) or expr[i] != '{':
+        return None
+    j = i + 1
+    while j < len(expr) and expr[j] in _DIGITOS:
+        j += 1
+    if j == i + 1:
+        return None
+    minimo, maximo = int(expr[i + 1:j]), None
+    if j < len(expr) and expr[j] == ',':
+        k = j + 1
+        while k < len(expr) and expr[k] in _DIGITOS:
+            k += 1
+        if k > j + 1:
+            maximo = int(expr[j + 1:k])
+        j = k
+    else:
+        maximo = minimo
+    if j >= len(expr) or expr[j] != '}':
+        return None
+    if maximo is not None and maximo < minimo:
+        raise ValueError(f"Cota inválida {expr[i:j + 1]}: mínimo mayor que máximo (posición {i})")
+    return expr[i:j + 1], j + 1
+
+
+def es_cota(tok: str) -> bool:
+    """
+    True si el token es una cota de repetición ('{2}', '{2,}', '{2,5}').
+    """
+    return len(tok) > 2 and tok[0] == '{' and tok[-1] == '}' and tok[1] in _DIGITOS
+
+
+def parsear_cota(tok: str):
+    """
+    Convierte un token de cota en (mínimo, máximo); máximo es None en {m,}.
+    """
+    partes = tok[1:-1].split(',')
+    minimo = int(partes[0])
+    if len(partes) == 1:
+        return minimo, minimo
+    return minimo, (int(partes[1]) if partes[1] else None)
+
 
 def expandir_clases(expr: str) -> str:
     r"""
@@ -55,7 +106,7 @@ def insertar_concatenaciones_tokens(tokens: list[str]) -> list[str]:
         t1, t2 = tokens[i], tokens[i + 1]
         out.append(t1)
 
-        prev_es_fin = _es_atomo(t1) or t1 in {')', '*', '+', '?'}
+        prev_es_fin = _es_atomo(t1) or t1 in {')', '*', '+', '?'} or es_cota(t1)
         next_es_ini = _es_atomo(t2) or t2 == '('
         if prev_es_fin and next_es_ini:
             out.append('.')
@@ -68,7 +119,8 @@ def _es_atomo(tok: str) -> bool:
     # - literales alfanuméricos ('a', 'b', 'if', 'else', 't', 'n', ...)
     # - 'ε'
     # - tokens escapados ('\\{', '\\}', '\\?', '\\.', ...)
-    return tok not in {'|', '.', '*', '+', '?', '(', ')'}
+    # (las cotas {m,n} son operadores)
+    return tok not in {'|', '.', '*', '+', '?', '(', ')'} and not es_cota(tok)
 
 def tokenizar_cadena(s: str) -> list[str]:
     """
@@ -97,6 +149,38 @@ def tokenizar_cadena(s: str) -> list[str]:
     return tokens
 
 
+def _inicio_operando(resultado: str, op: str) -> int:
+    """
+    Posición donde empieza el último operando de resultado: un grupo
+    entre paréntesis o un carácter, seguido de las cotas {m,n} que tenga.
+    """
+    if not resultado:
+        raise ValueError(f"Falta operando para operador unario '{op}'")
+    j = len(resultado) - 1
+    # saltar cotas ya aplicadas al operando (a{2}? = (a{2})?)
+    while resultado[j] == '}':
+        k = resultado.rfind('{', 0, j)
+        if (k <= 0 or resultado[k - 1] == '\\'
+                or not leer_cota(resultado, k) or leer_cota(resultado, k)[1] != j + 1):
+            break
+        j = k - 1
+    if resultado[j] != ')':
+        return j
+    # buscar inicio del grupo
+    count = 0
+    while j >= 0:
+        if resultado[j] == ')':
+            count += 1
+        elif resultado[j] == '(':
+            count -= 1
+            if count == 0:
+                break
+        j -= 1
+    if j < 0:
+        raise ValueError(f"Paréntesis desbalanceados antes de '{op}'")
+    return j
+
+
 def expandir_operadores(expr: str) -> str:
     """
     Expande los operadores + y ? en su forma equivalente:
@@ -115,35 +199,19 @@ def expandir_operadores(expr: str) -> str:
 
         elif expr[i] in {'+', '?'}:
             op = expr[i]
-            if resultado and resultado[-1] == ')':
-                # buscar inicio del grupo
-                count = 0
-                j = len(resultado) - 1
-                while j >= 0:
-                    if resultado[j] == ')':
-                        count += 1
-                    elif resultado[j] == '(':
-                        count -= 1
-                        if count == 0:
-                            break
-                    j -= 1
-                if j < 0:
-                    raise ValueError(f"Paréntesis desbalanceados antes de '{op}'")
-
-                grupo = resultado[j:]
+            j = _inicio_operando(resultado, op)
+            grupo = resultado[j:]
+            if resultado[-1] == ')':
                 if op == '+':
                     expansion = f'{grupo}.{grupo}*'
                 else:
                     expansion = f'({grupo}|ε)'
-
-                resultado = resultado[:j] + expansion
             else:
-                prev = resultado[-1]
                 if op == '+':
-                    expansion = f'({prev}.{prev}*)'
+                    expansion = f'({grupo}.{grupo}*)'
                 else:
-                    expansion = f'({prev}|ε)'
-                resultado = resultado[:-1] + expansion
+                    expansion = f'({grupo}|ε)'
+            resultado = resultado[:j] + expansion
             i += 1
 
         else:
@@ -156,7 +224,7 @@ def expandir_operadores(expr: str) -> str:
 def tokenize(regex: str) -> list[str]:
     """
     Convierte la expresión en lista de tokens.
-    Divide carácter por carácter, excepto palabras reservadas.
+    Divide carácter por carácter, excepto palabras reservadas y cotas {m,n}.
     """
     tokens = []
     i = 0
@@ -182,6 +250,10 @@ def tokenize(regex: str) -> list[str]:
             tokens.append('ε')
             i += 1
 
+        elif c == '{' and leer_cota(regex, i):
+            cota, i = leer_cota(regex, i)
+            tokens.append(cota)
+
         else:
             # palabra o secuencia de letras
             literal = c
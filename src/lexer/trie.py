@@ -0,0 +1,105 @@
+"""
+Módulo trie: tokenizador de cadenas de entrada generado a partir del
+alfabeto de un autómata compilado.
+
+Sigue las mismas reglas que tokenizar_cadena (una corrida de letras es
+un solo token si forma una palabra multicaracter; si no, se parte por
+carácter), pero:
+- las palabras salen del alfabeto del autómata (más RESERVED_WORDS, que
+  siempre cortan la corrida aunque el autómata no las use),
+- recorre la cadena una sola vez con un trie, sin slicing,
+- produce directamente los ids enteros de los símbolos.
+"""
+
+from .tokenizer import RESERVED_WORDS
+
+_FIN = ''  # clave del trie donde se guarda el id de una palabra completa
+
+
+class TokenizadorTrie:
+    def __init__(self, simbolos: dict, desconocido: int):
+        """
+        simbolos: dict[símbolo, id]; desconocido: id para todo lo demás.
+        """
+        self.desconocido = desconocido
+        self.caracteres = {}
+        self.raiz = {}
+        palabras = {s: i for s, i in simbolos.items() if len(s) > 1 and s.isalpha()}
+        for p in RESERVED_WORDS:
+            palabras.setdefault(p, desconocido)
+        for s, i in simbolos.items():
+            if len(s) == 1:
+                self.caracteres[s] = i
+        for palabra, i in palabras.items():
+            nodo = self.raiz
+            for c in palabra:
+                nodo = nodo.setdefault(c, {})
+            nodo[_FIN] = i
+
+    def flujo(self):
+        """
+        Tokenizador incremental para leer la entrada por fragmentos.
+        """
+        return FlujoTokens(self)
+
+    def ids(self, s: str):
+        """
+        Genera los ids de los tokens de la cadena s.
+        """
+        f = FlujoTokens(self)
+        yield from f.alimentar(s)
+        yield from f.terminar()
+
+
+class FlujoTokens:
+    """
+    Estado de un tokenizado por fragmentos: una corrida de letras puede
+    quedar abierta entre dos llamadas a alimentar().
+    """
+
+    def __init__(self, tokenizador: TokenizadorTrie):
+        self._tok = tokenizador
+        self._en_corrida = False  # dentro de una corrida de letras
+        self._nodo = None         # nodo del trie de la corrida (None = ya no es palabra)
+        self._pendientes = []     # ids por carácter mientras la corrida puede ser palabra
+
+    def _cerrar_corrida(self):
+        nodo, pendientes = self._nodo, self._pendientes
+        self._en_corrida, self._nodo, self._pendientes = False, None, []
+        if nodo is not None and _FIN in nodo:
+            return (nodo[_FIN],)
+        return pendientes
+
+    def alimentar(self, fragmento: str):
+        """
+        Genera los ids que ya quedan determinados tras leer fragmento.
+        Solo se retienen los ids de una corrida mientras todavía puede
+        ser una palabra (como mucho la longitud de la palabra más larga).
+        """
+        caracteres = self._tok.caracteres
+        desconocido = self._tok.desconocido
+        for c in fragmento:
+            i = caracteres.get(c, desconocido)
+            if c.isalpha():
+                if not self._en_corrida:
+                    self._en_corrida = True
+                    self._nodo = self._tok.raiz
+                if self._nodo is None:
+                    yield i
+                    continue
+                self._nodo = self._nodo.get(c)
+                self._pendientes.append(i)
+                if self._nodo is None:
+                    yield from self._pendientes
+                    self._pendientes = []
+            else:
+                if self._en_corrida:
+                    yield from self._cerrar_corrida()
+                yield i
+
+    def terminar(self):
+        """
+        Genera los ids pendientes al final de la entrada.
+        """
+        if self._en_corrida:
+            yield from self._cerrar_corrida()
@@ -0,0 +1,220 @@
+r"""
+Módulo descendente: parser descendente que lee la expresión
+regular una sola vez y construye el árbol sintáctico (Nodo) directamente,
+sin las pasadas de expansión, tokenizado, concatenación explícita y
+shunting yard.
+
+Gramática (mismas reglas léxicas que 'tokenize'):
+  alternativa   := concatenacion ('|' concatenacion)*
+  concatenacion := repeticion ('.'? repeticion)*      (concatenación implícita)
+  repeticion    := atomo ('*' | '+' | '?' | cota)*
+  cota          := '{' m '}' | '{' m ',}' | '{' m ',' n '}'
+  atomo         := '(' alternativa ')' | '[' clase ']' | '\' c | 'ε' | palabra | c
+
+- Los espacios se ignoran fuera de las clases.
+- Una corrida de letras que forma una palabra reservada (if, else, ...)
+  es un solo literal; si no, se parte por carácter. Si la sigue '+' o '?',
+  la última letra queda aparte (igual que con expandir_operadores).
+- '+', '?' y las cotas quedan como nodos propios (no se expanden a
+  A.A*, A|ε ni copias de A). Una '{' que no forma cota es un literal.
+- Cada nodo guarda inicio/fin: su posición en el texto original.
+- El anidamiento de grupos se lleva en una pila explícita (sin
+  recursión), así que no hay límite de profundidad.
+- Cada '(' abre un grupo de captura, numerado desde 1 en orden de
+  aparición; el nodo del grupo lo guarda en nodo.grupos.
+"""
+
+from lexer.tokenizer import RESERVED_WORDS, leer_cota
+from .node import Nodo
+
+
+class _Nivel:
+    """
+    Un nivel de anidamiento: la alternativa y la concatenación en curso
+    dentro de un grupo (o de la expresión completa si grupo es None).
+    """
+
+    def __init__(self, abre, grupo, inicio_concat):
+        self.abre = abre                    # posición del '(' del grupo
+        self.grupo = grupo                  # número del grupo de captura
+        self.inicio_concat = inicio_concat  # inicio de la concatenación en curso
+        self.alt = None                     # alternativas ya cerradas
+        self.concat = None                  # concatenación en curso
+
+
+class _Parser:
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.i = 0
+        self.num_grupos = 0
+
+    def _saltar_espacios(self):
+        texto, n = self.texto, len(self.texto)
+        while self.i < n and texto[self.i] == ' ':
+            self.i += 1
+
+    def _actual(self):
+        self._saltar_espacios()
+        return self.texto[self.i] if self.i < len(self.texto) else None
+
+    def parsear(self) -> Nodo:
+        """
+        Recorre la expresión una vez. Los grupos no usan recursión: cada
+        '(' apila un _Nivel con la alternativa y la concatenación en curso,
+        y cada ')' lo desapila y entrega el grupo como átomo al nivel de
+        afuera, así que la profundidad de anidamiento no tiene límite.
+        """
+        niveles = [_Nivel(None, None, self.i)]
+        while True:
+            nivel = niveles[-1]
+            c = self._actual()
+            if c == '.':
+                if nivel.concat is None:
+                    raise ValueError(f"Falta operando izquierdo para '.' (posición {self.i})")
+                self.i += 1
+                c = self._actual()
+                if c is None or c in {'|', ')', '*', '+', '?', '.'}:
+                    raise ValueError(f"Falta operando derecho para '.' (posición {self.i - 1})")
+            if c == '(':
+                self.num_grupos += 1
+                self.i += 1
+                niveles.append(_Nivel(self.i - 1, self.num_grupos, self.i))
+                continue
+            if c is not None and c not in {'|', ')'}:
+                self._concatenar(nivel, self.repeticion(self.atomo()))
+                continue
+
+            # fin de una concatenación
+            if nivel.concat is None:
+                raise ValueError(f"Expresión vacía (posición {nivel.inicio_concat})")
+            izq, der = nivel.alt, nivel.concat
+            nivel.alt = der if izq is None else Nodo('|', izq, der, inicio=izq.inicio, fin=der.fin)
+            nivel.concat = None
+            if c == '|':
+                self.i += 1
+                nivel.inicio_concat = self.i
+                continue
+            if nivel.grupo is None:
+                if c == ')':
+                    # solo puede quedar un ')' sin su '('
+                    raise ValueError(f"Falta paréntesis de apertura para ')' (posición {self.i})")
+                return nivel.alt
+            if c != ')':
+                raise ValueError(f"Falta paréntesis de cierre para '(' (posición {nivel.abre})")
+            self.i += 1
+            niveles.pop()
+            nodo = nivel.alt
+            nodo.inicio, nodo.fin = nivel.abre, self.i
+            nodo.grupos = (nivel.grupo,) + nodo.grupos
+            self._concatenar(niveles[-1], self.repeticion([nodo]))
+
+    def _concatenar(self, nivel, nodos):
+        for der in nodos:
+            izq = nivel.concat
+            nivel.concat = der if izq is None else Nodo('.', izq, der, inicio=izq.inicio, fin=der.fin)
+
+    def repeticion(self, nodos):
+        """
+        Aplica los operadores posfijos que siguen al átomo. nodos es la
+        lista de nodos a concatenar: normalmente uno, varios si el átomo
+        era una corrida de letras que no forma palabra reservada (el
+        operador posterior afecta solo a la última letra).
+        """
+        while True:
+            c = self._actual()
+            if c in {'*', '+', '?'}:
+                op = c
+                self.i += 1
+            elif c == '{' and leer_cota(self.texto, self.i):
+                op, self.i = leer_cota(self.texto, self.i)
+            else:
+                break
+            ultimo = nodos[-1]
+            nodos[-1] = Nodo(op, ultimo, inicio=ultimo.inicio, fin=self.i)
+        return nodos
+
+    def atomo(self):
+        texto, i = self.texto, self.i
+        c = texto[i]
+        if c in {'*', '+', '?'}:
+            raise ValueError(f"Falta operando para operador unario '{c}' (posición {i})")
+        if c == '{' and leer_cota(texto, i):
+            raise ValueError(f"Falta operando para la cota {leer_cota(texto, i)[0]} (posición {i})")
+        if c == '[':
+            return [self.clase()]
+        if c == '\\':
+            if i + 1 >= len(texto):
+                raise ValueError(f"Secuencia de escape incompleta (posición {i})")
+            self.i = i + 2
+            return [Nodo(texto[i:i + 2], inicio=i, fin=i + 2)]
+        if c == 'ε':
+            self.i = i + 1
+            return [Nodo('ε', inicio=i, fin=i + 1)]
+
+        # palabra o secuencia de letras (igual que 'tokenize')
+        j = i + 1
+        while j < len(texto) and texto[j].isalpha():
+            j += 1
+        self.i = j
+        fin_palabra = j
+        if j - i > 1 and j < len(texto) and texto[j] in {'+', '?'}:
+            # como expandir_operadores: '+' y '?' separan la última letra
+            # antes de buscar palabras reservadas ('elsec?' = else.c?)
+            fin_palabra = j - 1
+        if fin_palabra - i > 1 and texto[i:fin_palabra] in RESERVED_WORDS:
+            return ([Nodo(texto[i:fin_palabra], inicio=i, fin=fin_palabra)]
+                    + [Nodo(texto[k], inicio=k, fin=k + 1) for k in range(fin_palabra, j)])
+        return [Nodo(texto[k], inicio=k, fin=k + 1) for k in range(i, j)]
+
+    def clase(self) -> Nodo:
+        """
+        Clase [abc] -> (a|b|c); dentro de la clase '\\x' es un solo literal.
+        """
+        texto, inicio = self.texto, self.i
+        i = inicio + 1
+        nodo = None
+        while i < len(texto) and texto[i] != ']':
+            if texto[i] == '\\':
+                if i + 1 >= len(texto):
+                    raise ValueError(f"Secuencia de escape incompleta (posición {i})")
+                hoja = Nodo(texto[i:i + 2], inicio=i, fin=i + 2)
+                i += 2
+            else:
+                hoja = Nodo(texto[i], inicio=i, fin=i + 1)
+                i += 1
+            nodo = hoja if nodo is None else Nodo('|', nodo, hoja, inicio=nodo.inicio, fin=hoja.fin)
+        if i >= len(texto) or nodo is None:
+            raise ValueError(f"Clase de caracteres sin cerrar o vacía (posición {inicio})")
+        self.i = i + 1
+        nodo.inicio, nodo.fin = inicio, self.i
+        return nodo
+
+
+def parsear_regex(regex: str) -> Nodo:
+    """
+    Construye el árbol sintáctico de la expresión en una sola pasada.
+    La raíz guarda en num_grupos la cantidad de grupos de captura.
+    Lanza ValueError indicando la posición del error.
+    """
+    p = _Parser(regex)
+    raiz = p.parsear()
+    raiz.num_grupos = p.num_grupos
+    return raiz
+
+
+def postfijo_de(raiz: Nodo) -> list[str]:
+    """
+    Recorrido en postorden del árbol (la notación postfija equivalente).
+    """
+    salida, pila = [], [(raiz, False)]
+    while pila:
+        nodo, visto = pila.pop()
+        if nodo is None:
+            continue
+        if visto:
+            salida.append(nodo.valor)
+        else:
+            pila.append((nodo, True))
+            pila.append((nodo.derecha, False))
+            pila.append((nodo.izquierda, False))
+    return salida
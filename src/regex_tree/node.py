@@ -1,11 +1,17 @@
 """
 Definición de la clase Nodo, usada para construir el árbol sintáctico
-de la expresión regular en notación postfija.
+de la expresión regular (desde notación postfija o con el parser
+descendente).
 """
 
 class Nodo:
-    def __init__(self, valor, izquierda=None, derecha=None):
+    def __init__(self, valor, izquierda=None, derecha=None, inicio=None, fin=None):
         self.valor = valor
         self.izquierda = izquierda
         self.derecha = derecha
         self.id = id(self)  # identificador único para dibujar
+        # posición [inicio, fin) en el texto de la regex (None si no se conoce)
+        self.inicio = inicio
+        self.fin = fin
+        # grupos de captura que delimita este nodo (de afuera hacia adentro)
+        self.grupos = ()
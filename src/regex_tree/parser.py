@@ -1,15 +1,15 @@
 """
 Módulo parser: construcción y visualización del árbol sintáctico
 a partir de una expresión regular en notación postfija.
+graphviz se importa y la carpeta se crea recién al dibujar.
 """
 
 import os
-from graphviz import Digraph
+from lexer.tokenizer import es_cota
 from .node import Nodo
 
-# Carpeta donde se guardarán las imágenes
+# Carpeta donde se guardarán las imágenes (se crea al dibujar)
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), "..", "results")
-os.makedirs(RESULTS_DIR, exist_ok=True)
 
 
 def construir_arbol(postfix: list[str]) -> Nodo:
@@ -19,7 +19,7 @@ def construir_arbol(postfix: list[str]) -> Nodo:
     """
     pila = []
     for token in postfix:
-        if token in {'*', '+', '?'}:  # operadores unarios
+        if token in {'*', '+', '?'} or es_cota(token):  # operadores unarios
             if not pila:
                 raise ValueError(f"Falta operando para operador unario '{token}'")
             nodo = Nodo(token, izquierda=pila.pop())
@@ -48,21 +48,24 @@ def dibujar_arbol(raiz: Nodo, filename: str):
     Dibuja el árbol sintáctico usando Graphviz y lo exporta como PNG
     en la carpeta src/results.
     """
+    from graphviz import Digraph  # import diferido: solo hace falta para dibujar
     dot = Digraph()
 
-    def agregar_nodos(nodo: Nodo):
+    # preorden con pila explícita (sin límite de profundidad); la arista
+    # al hijo derecho se agrega recién después de todo el subárbol
+    # izquierdo, igual que en el recorrido recursivo
+    pila = [(raiz, None)]
+    while pila:
+        nodo, padre = pila.pop()
         if nodo is None:
-            return
+            continue
+        if padre is not None:
+            dot.edge(str(padre.id), str(nodo.id))
         # usar str() por si el valor es multicaracter
         dot.node(str(nodo.id), str(nodo.valor))
-        if nodo.izquierda:
-            dot.edge(str(nodo.id), str(nodo.izquierda.id))
-            agregar_nodos(nodo.izquierda)
-        if nodo.derecha:
-            dot.edge(str(nodo.id), str(nodo.derecha.id))
-            agregar_nodos(nodo.derecha)
-
-    agregar_nodos(raiz)
+        pila.append((nodo.derecha, nodo))
+        pila.append((nodo.izquierda, nodo))
 
+    os.makedirs(RESULTS_DIR, exist_ok=True)
     output_path = os.path.join(RESULTS_DIR, filename)
     dot.render(output_path, format='png', cleanup=True)
@@ -0,0 +1,237 @@
+"""
+Servicio de coincidencias de larga duración (asyncio).
+
+Mantiene los patrones compilados (AFDmin + tabla) en una caché LRU de
+tamaño acotado y atiende un protocolo de JSON por líneas sobre TCP local
+o un socket Unix. Cada petición es un objeto JSON en una línea y cada
+respuesta también; 'id' se devuelve tal cual:
+
+  {"id": 1, "op": "compile", "regex": "(a|b)*abb"}
+  {"id": 2, "op": "match", "regex": "(a|b)*abb", "w": "aabb"}
+  {"id": 3, "op": "match_batch", "regex": "(a|b)*abb", "ws": ["abb", "ab"]}
+  {"id": 4, "op": "stats"}
+
+Respuestas: {"id": ..., "ok": true, ...} o {"id": ..., "ok": false, "error": "..."}.
+'w' es la cadena tal cual (sin interpretar escapes ni 'ε').
+Una línea de más de 16 MiB recibe un error con "id": null y se cierra la
+conexión.
+
+La compilación corre en un ThreadPoolExecutor (cada una con su propio
+ContextoCompilacion) para que el event loop siga atendiendo peticiones;
+también las evaluaciones largas (cadenas o lotes grandes, o patrones sin
+AFD, que simulan el AFN). Las compilaciones que fallan se guardan en la
+misma caché, así que una regex inválida no se recompila en cada pedido.
+
+Uso (desde src/):
+    python -m servicio.servidor [--host 127.0.0.1] [--puerto 8765]
+                                [--unix RUTA] [--capacidad 256] [--hilos N]
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from automata.cache import CacheLRU
+from utils.compilar import compilar_patron
+
+# lotes con más cadenas que esto se evalúan en el executor
+_LOTE_EN_EXECUTOR = 256
+# cadenas (o lotes) con más caracteres que esto también
+_LARGO_EN_EXECUTOR = 64 * 1024
+# límite de una línea del protocolo (regex muy largas)
+_LIMITE_LINEA = 16 * 1024 * 1024
+
+
+def _compilar(regex: str):
+    patron = compilar_patron(regex)
+    if patron.tiene_afd:
+        patron.tabla()  # crear tabla y tokenizador fuera del event loop
+    return patron
+
+
+class ServicioCoincidencias:
+    def __init__(self, capacidad: int = 256, hilos: int = None):
+        self.cache = CacheLRU(capacidad)
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos)
+        self._en_curso = {}  # regex -> Task de una compilación en marcha
+        self.peticiones = 0
+        self.errores = 0
+        self.conexiones = 0
+
+    async def patron(self, regex: str):
+        """
+        Patrón compilado desde la caché; si no está, se compila en el
+        executor (una sola vez aunque lo pidan varias peticiones a la vez).
+        Si la compilación falló, la caché guarda el error y se relanza.
+        La compilación es una tarea propia y cada petición la espera con
+        shield: cancelar una petición no cancela la compilación que
+        esperan las demás.
+        """
+        patron = self.cache.obtener(regex)
+        if isinstance(patron, Exception):
+            raise patron.with_traceback(None)
+        if patron is not None:
+            return patron
+        tarea = self._en_curso.get(regex)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._compilar_y_guardar(regex))
+            # si todas las peticiones se cancelaron nadie lee el error
+            tarea.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._en_curso[regex] = tarea
+        return await asyncio.shield(tarea)
+
+    async def _compilar_y_guardar(self, regex: str):
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                patron = await loop.run_in_executor(self._ejecutor, _compilar, regex)
+            except Exception as e:
+                self.cache.guardar(regex, e)  # entrada negativa
+                raise
+            self.cache.guardar(regex, patron)
+            return patron
+        finally:
+            del self._en_curso[regex]
+
+    def estadisticas(self) -> dict:
+        return {
+            "patrones_en_cache": len(self.cache),
+            "capacidad": self.cache.capacidad,
+            "aciertos": self.cache.aciertos,
+            "fallos": self.cache.fallos,
+            "descartes": self.cache.descartes,
+            "compilando": len(self._en_curso),
+            "peticiones": self.peticiones,
+            "errores": self.errores,
+            "conexiones": self.conexiones,
+        }
+
+    async def atender(self, peticion: dict) -> dict:
+        """
+        Ejecuta una petición ya decodificada y arma la respuesta.
+        """
+        op = peticion.get("op")
+        if op == "stats":
+            return {"stats": self.estadisticas()}
+
+        regex = peticion.get("regex")
+        if not isinstance(regex, str):
+            raise ValueError("Falta 'regex'")
+        if op == "compile":
+            en_cache = regex in self.cache
+            patron = await self.patron(regex)
+            # sin AFDmin (AFD demasiado grande) no hay estados que informar
+            estados = len(patron.min_states) if patron.tiene_afd else None
+            return {"estados": estados, "en_cache": en_cache}
+        if op == "match":
+            w = peticion.get("w")
+            if not isinstance(w, str):
+                raise ValueError("Falta 'w'")
+            patron = await self.patron(regex)
+            if len(w) > _LARGO_EN_EXECUTOR or not patron.tiene_afd:
+                loop = asyncio.get_running_loop()
+                return {"resultado": await loop.run_in_executor(
+                    self._ejecutor, patron.coincide, w)}
+            return {"resultado": patron.coincide(w)}
+        if op == "match_batch":
+            ws = peticion.get("ws")
+            if not isinstance(ws, list) or not all(isinstance(w, str) for w in ws):
+                raise ValueError("'ws' debe ser una lista de cadenas")
+            patron = await self.patron(regex)
+            if (len(ws) > _LOTE_EN_EXECUTOR or not patron.tiene_afd
+                    or sum(map(len, ws)) > _LARGO_EN_EXECUTOR):
+                loop = asyncio.get_running_loop()
+                resultados = await loop.run_in_executor(
+                    self._ejecutor, patron.coincide_lote, ws)
+            else:
+                resultados = patron.coincide_lote(ws)
+            return {"resultados": resultados}
+        raise ValueError(f"Operación no soportada: {op}")
+
+    async def _responder(self, linea: bytes) -> dict:
+        self.peticiones += 1
+        ident = None
+        try:
+            peticion = json.loads(linea)
+            if not isinstance(peticion, dict):
+                raise ValueError("La petición debe ser un objeto JSON")
+            ident = peticion.get("id")
+            return {"id": ident, "ok": True, **await self.atender(peticion)}
+        except Exception as e:
+            self.errores += 1
+            return {"id": ident, "ok": False, "error": str(e)}
+
+    async def conexion(self, lector, escritor):
+        """
+        Atiende una conexión: las respuestas salen en el orden de las
+        peticiones de esa conexión.
+        """
+        self.conexiones += 1
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # línea de más de _LIMITE_LINEA: el resto de la conexión
+                    # ya no se puede separar en peticiones
+                    self.errores += 1
+                    await self._enviar(escritor, {
+                        "id": None, "ok": False,
+                        "error": f"Línea de más de {_LIMITE_LINEA} bytes"})
+                    break
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                await self._enviar(escritor, await self._responder(linea))
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.conexiones -= 1
+            escritor.close()
+
+    @staticmethod
+    async def _enviar(escritor, respuesta: dict):
+        escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b"\n")
+        await escritor.drain()
+
+    async def iniciar(self, host: str = "127.0.0.1", puerto: int = 8765, unix: str = None):
+        """
+        Abre el servidor (TCP local o socket Unix) y lo devuelve sin bloquear.
+        """
+        if unix:
+            return await asyncio.start_unix_server(self.conexion, path=unix, limit=_LIMITE_LINEA)
+        return await asyncio.start_server(self.conexion, host, puerto, limit=_LIMITE_LINEA)
+
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=False)
+
+
+async def _servir(args):
+    servicio = ServicioCoincidencias(args.capacidad, args.hilos)
+    servidor = await servicio.iniciar(args.host, args.puerto, args.unix)
+    destino = args.unix or f"{args.host}:{args.puerto}"
+    print(f"Servicio de coincidencias escuchando en {destino}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio de coincidencias con caché LRU")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument("--capacidad", type=int, default=256, help="patrones en la caché LRU")
+    parser.add_argument("--hilos", type=int, default=None, help="hilos para compilar")
+    try:
+        asyncio.run(_servir(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
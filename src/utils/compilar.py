@@ -0,0 +1,304 @@
+"""
+Módulo compilar: compila una expresión regular una sola vez.
+- Construye el árbol sintáctico con el parser descendente (una pasada)
+- Construye AFN, AFD y AFDmin
+- Permite evaluar muchas cadenas con el mismo autómata compilado
+- Compila varias expresiones en paralelo (un ContextoCompilacion por hilo)
+- Obtiene funciones matcher generadas a partir del AFDmin (con caché)
+- Evalúa cadenas sobre la tabla del AFDmin con el tokenizador trie
+  derivado de su alfabeto (una cadena, un lote o por fragmentos)
+- Evalúa entradas en bytes (bytes, bytearray, memoryview, mmap) sobre
+  el AFD bajado a UTF-8, sin decodificar ni copiar
+- Extrae lo que capturó cada grupo con la máquina de Pike, solo para
+  cadenas que el AFD ya aceptó
+- Las repeticiones {m,n} grandes usan contadores en el AFN; el AFD se
+  construye igual, sobre configuraciones (estado, contadores)
+- Si el AFD pasa de MAX_ESTADOS_AFD estados no se construye y las
+  cadenas se evalúan simulando el AFN
+"""
+
+from lexer.tokenizer import tokenizar_cadena
+from lexer.trie import TokenizadorTrie
+from regex_tree.descendente import parsear_regex, postfijo_de
+from automata.contexto import ContextoCompilacion
+from automata.thompson import construir_afn_desde_arbol
+from automata.simulate import acepta, acepta_afd
+from automata.subset import construir_afd_desde_afn, AFDDemasiadoGrande, MAX_ESTADOS_AFD
+from automata.minimize import minimizar_afd
+from automata.equivalencia import equivalentes
+from automata.codegen import clave_patron, compilar_matcher, matcher_en_cache
+from automata.tabla import TablaAFD
+from automata.afd_bytes import AFDBytes
+from automata.pike import capturar
+
+
+class PatronCompilado:
+    """
+    Resultado de compilar una expresión regular: guarda el árbol
+    sintáctico y los tres autómatas. conteo es True si el AFN usa
+    contadores. Si el AFD pasaba de MAX_ESTADOS_AFD estados (tiene_afd
+    es False) no hay AFD ni AFDmin y esos atributos quedan en None:
+    coincide, coincide_lote, coincide_bytes, flujo y grupos simulan el
+    AFN, y lo que es propio del AFD (verificar, matcher, tabla,
+    afd_bytes) lanza ValueError.
+    """
+
+    def __init__(self, regex, raiz, afn, start_dfa, dfa_states, start_min, min_states,
+                 max_estados_expansion=None):
+        self.regex = regex
+        self.raiz = raiz
+        self.afn = afn
+        self.start_dfa = start_dfa
+        self.dfa_states = dfa_states
+        self.start_min = start_min
+        self.min_states = min_states
+        self.conteo = bool(afn.contadores)
+        self.tiene_afd = start_dfa is not None
+        self.max_estados_expansion = max_estados_expansion  # ver ContextoCompilacion
+        self._tabla = None
+        self._tokenizador = None
+        self._afd_bytes = None
+        self._afn_grupos = None
+
+    def postfijo(self) -> list[str]:
+        """
+        Notación postfija equivalente al árbol (solo para mostrarla).
+        """
+        return postfijo_de(self.raiz)
+
+    def evaluar(self, tokens_w: list[str]):
+        """
+        Simula la cadena (ya tokenizada) en AFN, AFD y AFDmin.
+        Retorna (ok_afn, ok_afd, ok_min); sin AFD los dos últimos son None.
+        """
+        if not self.tiene_afd:
+            return acepta(self.afn, tokens_w), None, None
+        return (
+            acepta(self.afn, tokens_w),
+            acepta_afd(self.start_dfa, tokens_w),
+            acepta_afd(self.start_min, tokens_w),
+        )
+
+    def verificar(self):
+        """
+        Comprueba que la minimización preservó el lenguaje (AFD ≡ AFDmin).
+        Retorna (True, None) o (False, contraejemplo).
+        """
+        self._requiere_afd()
+        return equivalentes(self.start_dfa, self.start_min)
+
+    def matcher(self):
+        """
+        Función tokens -> bool generada a partir del AFDmin (ver
+        automata.codegen); se cachea por hash de la regex.
+        """
+        self._requiere_afd()
+        return compilar_matcher(self.start_min, clave_patron(self.regex))
+
+    def tabla(self):
+        """
+        Tabla de transiciones del AFDmin y su tokenizador (se crean una vez).
+        """
+        self._requiere_afd()
+        if self._tabla is None:
+            tabla = TablaAFD(self.start_min)
+            self._tokenizador = TokenizadorTrie(tabla.simbolos, tabla.desconocido)
+            self._tabla = tabla
+        return self._tabla, self._tokenizador
+
+    def coincide(self, cadena: str) -> bool:
+        """
+        Evalúa la cadena w (sin tokenizar) en una sola pasada: el
+        tokenizador trie produce ids que van directo a la tabla.
+        """
+        if not self.tiene_afd:
+            return acepta(self.afn, tokenizar_cadena(cadena))
+        tabla, tokenizador = self.tabla()
+        return tabla.coincide_ids(tokenizador.ids(cadena))
+
+    def coincide_lote(self, cadenas) -> list[bool]:
+        """
+        Evalúa muchas cadenas con la misma tabla y tokenizador.
+        """
+        if not self.tiene_afd:
+            return [self.coincide(c) for c in cadenas]
+        tabla, tokenizador = self.tabla()
+        return [tabla.coincide_ids(tokenizador.ids(c)) for c in cadenas]
+
+    def afd_bytes(self) -> AFDBytes:
+        """
+        AFD sobre bytes UTF-8 derivado de la tabla (se crea una vez).
+        """
+        self._requiere_afd()
+        if self._afd_bytes is None:
+            self._afd_bytes = AFDBytes(*self.tabla())
+        return self._afd_bytes
+
+    def coincide_bytes(self, datos) -> bool:
+        """
+        Igual que coincide pero sobre la entrada en bytes UTF-8 (bytes,
+        bytearray, memoryview, mmap); los bytes inválidos no coinciden.
+        """
+        if not self.tiene_afd:
+            try:
+                cadena = bytes(datos).decode('utf-8')
+            except UnicodeDecodeError:
+                return False
+            return self.coincide(cadena)
+        return self.afd_bytes().coincide(datos)
+
+    def grupos(self, cadena: str):
+        """
+        Subcadenas capturadas por los grupos 1..n (None si un grupo no
+        participó), como re.Match.groups(); None si w no coincide.
+        Primero se decide con el AFD y solo si coincide se corre la
+        máquina de Pike sobre el AFN con capturas (se crea una vez).
+        """
+        if not self.coincide(cadena):
+            return None
+        num_grupos = self.raiz.num_grupos
+        if self._afn_grupos is None:
+            self._afn_grupos = construir_afn_desde_arbol(
+                self.raiz, ContextoCompilacion(self.max_estados_expansion), capturas=True)
+        tokens = tokenizar_cadena(cadena)
+        ranuras = capturar(self._afn_grupos, tokens, num_grupos)
+        if ranuras is None:
+            return None
+        # posición en la cadena donde empieza cada token
+        offsets = [0]
+        for tok in tokens:
+            offsets.append(offsets[-1] + len(tok))
+        resultado = []
+        for k in range(1, num_grupos + 1):
+            inicio, fin = ranuras[2 * k], ranuras[2 * k + 1]
+            resultado.append(None if inicio is None else cadena[offsets[inicio]:offsets[fin]])
+        return tuple(resultado)
+
+    def flujo(self):
+        """
+        Evaluación por fragmentos (ver FlujoPatron; sin AFD, FlujoAFN).
+        """
+        if not self.tiene_afd:
+            return FlujoAFN(self.afn)
+        tabla, tokenizador = self.tabla()
+        return FlujoPatron(tabla, tokenizador)
+
+    def _requiere_afd(self):
+        if not self.tiene_afd:
+            raise ValueError(f"La regex {self.regex!r} no tiene AFD "
+                             f"(pasa de {MAX_ESTADOS_AFD} estados)")
+
+
+class FlujoPatron:
+    """
+    Evalúa una cadena que llega por fragmentos: alimentar() con cada
+    fragmento y terminar() para obtener el resultado.
+    """
+
+    def __init__(self, tabla, tokenizador):
+        self._tabla = tabla
+        self._tokens = tokenizador.flujo()
+        self._estado = 0
+
+    def alimentar(self, fragmento: str):
+        if self._estado >= 0:
+            self._estado = self._tabla.avanzar(
+                self._estado, self._tokens.alimentar(fragmento))
+
+    def terminar(self) -> bool:
+        if self._estado >= 0:
+            self._estado = self._tabla.avanzar(self._estado, self._tokens.terminar())
+        return self._tabla.acepta_estado(self._estado)
+
+
+class FlujoAFN:
+    """
+    Igual que FlujoPatron para un patrón sin AFD: sin tabla ni
+    tokenizador por fragmentos, junta los fragmentos y simula el AFN
+    al terminar.
+    """
+
+    def __init__(self, afn):
+        self._afn = afn
+        self._fragmentos = []
+
+    def alimentar(self, fragmento: str):
+        self._fragmentos.append(fragmento)
+
+    def terminar(self) -> bool:
+        return acepta(self._afn, tokenizar_cadena(''.join(self._fragmentos)))
+
+
+def arbol_regex(r: str):
+    """
+    Solo la parte sintáctica de la compilación: devuelve el árbol de r
+    (útil para automata.conjunto.ConjuntoPatrones).
+    """
+    return parsear_regex(r)
+
+
+def compilar_patron(r: str, ctx=None) -> PatronCompilado:
+    """
+    Ejecuta toda la cadena de construcción para la expresión r:
+    árbol (parser descendente), AFN, AFD y AFDmin (sin AFD si pasa de
+    MAX_ESTADOS_AFD estados).
+    Todos los ids salen de ctx (uno nuevo si es None), por lo que
+    compilaciones con contextos distintos no comparten estado.
+    """
+    if ctx is None:
+        ctx = ContextoCompilacion()
+
+    try:
+        # 1) árbol sintáctico en una sola pasada
+        raiz = parsear_regex(r)
+
+        # 2) autómatas
+        afn = construir_afn_desde_arbol(raiz, ctx)
+        try:
+            start_dfa, dfa_states = construir_afd_desde_afn(afn, ctx)
+        except AFDDemasiadoGrande:
+            return PatronCompilado(r, raiz, afn, None, None, None, None,
+                                   ctx.max_estados_expansion)
+        start_min, min_states = minimizar_afd(start_dfa, dfa_states, ctx)
+    except RecursionError:
+        # el parser y Thompson no recursan; esto es solo una red para que
+        # una expresión patológica sea un error de la regex y no corte
+        # procesar_archivo
+        raise ValueError("Expresión demasiado anidada") from None
+
+    return PatronCompilado(r, raiz, afn, start_dfa, dfa_states, start_min, min_states,
+                           ctx.max_estados_expansion)
+
+
+def _compilar_o_error(r: str):
+    try:
+        return compilar_patron(r)
+    except Exception as e:
+        return e
+
+
+def compilar_patrones(regexes, hilos=None) -> dict:
+    """
+    Compila cada regex distinta una vez usando un ThreadPoolExecutor.
+    Retorna dict[regex, PatronCompilado | Exception]; los errores se
+    devuelven en lugar de lanzarse para no cortar el resto del lote.
+    """
+    # import diferido: concurrent.futures (y logging) pesa más que el resto
+    # del módulo y solo hace falta para compilar en lote
+    from concurrent.futures import ThreadPoolExecutor
+
+    distintas = list(dict.fromkeys(regexes))
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        resultados = ejecutor.map(_compilar_o_error, distintas)
+        return dict(zip(distintas, resultados))
+
+
+def obtener_matcher(r: str):
+    """
+    Función matcher de la regex r. Si ya está en la caché de codegen no
+    se vuelve a compilar el patrón.
+    """
+    funcion = matcher_en_cache(clave_patron(r))
+    if funcion is None:
+        funcion = compilar_patron(r).matcher()
+    return funcion
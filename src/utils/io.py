@@ -2,24 +2,20 @@
 Módulo io: funciones de entrada/salida.
 - Interpretar cadenas literales (manejar \n, \t, etc.)
 - Parsear una línea de archivo en (expresión, cadena)
-- Procesar un archivo completo: árbol, AFN, AFD, AFDmin y simulación
+- Agrupar las líneas en casos (un patrón con muchas cadenas)
+- Procesar un archivo completo: árbol, AFN, AFD, AFDmin y simulación,
+  reutilizando lo que no cambió desde la ejecución anterior
 """
 
-from lexer.tokenizer import (
-    expandir_clases,
-    expandir_operadores,
-    insertar_concatenaciones_tokens,
-    tokenize,
-    tokenizar_cadena,
-)
-from lexer.shunting_yard import shunting_yard
-from regex_tree.parser import construir_arbol, dibujar_arbol
-from automata.state import State
-from automata.thompson import construir_afn_desde_arbol
-from automata.draw import dibujar_afn, dibujar_afd, dibujar_afd_min
-from automata.simulate import acepta, acepta_afd
-from automata.subset import construir_afd_desde_afn
-from automata.minimize import minimizar_afd
+import os
+
+from lexer.tokenizer import tokenizar_cadena
+from automata.subset import MAX_ESTADOS_AFD
+from utils.compilar import compilar_patrones
+from utils.manifiesto import Manifiesto, archivos_patron, hash_caso
+
+# Carpeta de las imágenes y del manifiesto (la misma que usan los dibujos)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "..", "results")
 
 
 def interpretar_cadena_literal(s: str) -> str:
@@ -50,7 +46,8 @@ def parsear_linea(linea: str):
     Formatos permitidos:
       regex ; cadena
       regex  cadena
-      regex  (se asume w = ε)
+      regex  (cadena = None: se asume w = ε si no le siguen cadenas)
+    Las líneas indentadas de un bloque se reconocen en leer_casos.
     """
     linea = linea.strip()
     if not linea:
@@ -60,89 +57,239 @@ def parsear_linea(linea: str):
         return r.strip(), w.strip()
     partes = linea.split(None, 1)
     if len(partes) == 1:
-        return partes[0], 'ε'
+        return partes[0], None
     return partes[0], partes[1]
 
 
-def procesar_archivo(nombre_archivo: str):
+def leer_casos(lineas: list[str], avisos=None):
     """
-    Procesa un archivo línea por línea:
+    Agrupa las líneas en casos (número de línea, regex, cadena) respetando
+    el orden original. Además del formato clásico (una regex y una cadena
+    por línea) acepta bloques: una línea con la regex sola seguida de
+    líneas indentadas, cada una con una cadena a probar.
+
+        (a|b)*abb
+            aabb
+            ε
+            abab
+
+    Una línea indentada solo es cadena de un bloque si antes hay una regex
+    sola; si no, se lee como una línea clásica. Si una cadena de bloque
+    parece un par regex/cadena (tiene ';' o ',') se agrega a avisos
+    (lista de (número de línea, mensaje)) por si la sangría es un error.
+    """
+    casos = []
+    actual = None        # regex del bloque abierto (None si no hay bloque)
+    pendiente = None     # caso implícito (w = ε) de un patrón sin cadena
+    for i, linea in enumerate(lineas):
+        linea = linea.rstrip('\r\n')
+        if not linea.strip():
+            continue
+        if actual is not None and linea[0].isspace():
+            # cadena de un bloque: el patrón sin cadena era un encabezado
+            w = linea.strip()
+            if avisos is not None and (';' in w or ',' in w):
+                avisos.append((i + 1, f"cadena indentada {w!r} parece un par "
+                                      f"regex/cadena; se toma como cadena de {actual!r}"))
+            pendiente = None
+            casos.append((i + 1, actual, w))
+            continue
+        r, w = parsear_linea(linea)
+        if pendiente is not None:
+            casos.append(pendiente)
+        if w is None:
+            actual = r
+            pendiente = (i + 1, r, 'ε')
+        else:
+            actual = None
+            pendiente = None
+            casos.append((i + 1, r, w))
+    if pendiente is not None:
+        casos.append(pendiente)
+    return casos
+
+
+def _resultado(ok) -> str:
+    # None: el patrón no tiene ese autómata (AFD demasiado grande)
+    if ok is None:
+        return "n/a"
+    return "sí" if ok else "no"
+
+
+def _resumen(patron) -> list[str]:
+    """
+    Líneas que se muestran la primera vez que aparece un patrón
+    (se guardan en el manifiesto para no recompilarlo).
+    """
+    lineas = ["Postfija: " + ' '.join(patron.postfijo())]
+    if not patron.tiene_afd:
+        lineas.append(f"AFD: no se construye (pasa de {MAX_ESTADOS_AFD} estados)")
+    else:
+        ok, contraejemplo = patron.verificar()
+        lineas.append("AFD ≡ AFDmin: " + ("sí" if ok else f"no (contraejemplo: {contraejemplo})"))
+    return lineas
+
+
+def _dibujar(patron, k: int):
+    """
+    Genera las imágenes del patrón con el sufijo expr_k
+    (k = primera línea donde aparece). Los módulos de dibujo (y graphviz)
+    se cargan recién aquí.
+    """
+    from regex_tree.parser import dibujar_arbol
+    from automata.draw import dibujar_afn, dibujar_afd, dibujar_afd_min
+
+    dibujar_arbol(patron.raiz, f"arbol_expr_{k}")
+    dibujar_afn(patron.afn, f"afn_expr_{k}")
+    if not patron.tiene_afd:
+        return
+    dibujar_afd(patron.start_dfa, patron.dfa_states, f"afd_expr_{k}")
+    dibujar_afd_min(patron.start_min, patron.min_states, f"afd_min_expr_{k}")
+
+
+def _planificar(anterior, primeras, casos):
+    """
+    Decide qué patrones hay que compilar y cuáles dibujar comparando con
+    el manifiesto anterior. Retorna (a_compilar, a_dibujar).
+    """
+    a_dibujar = set()
+    for r in primeras:
+        info = anterior.patrones.get(r)
+        if info is None or not anterior.artefactos_presentes(info):
+            a_dibujar.add(r)
+    a_compilar = set(a_dibujar)
+    for _, r, w_raw in casos:
+        if r in a_compilar:
+            continue
+        if "error" not in anterior.patrones[r] and hash_caso(r, w_raw) not in anterior.casos:
+            a_compilar.add(r)
+    return a_compilar, a_dibujar
+
+
+def _actualizar_artefactos(anterior, nuevo, a_dibujar):
+    """
+    Borra las imágenes de patrones que ya no están (o que se vuelven a
+    dibujar) y renombra las de patrones que cambiaron de primera línea.
+    """
+    borrar, mover = [], []
+    for r, info in anterior.patrones.items():
+        archivos = info.get("archivos", [])
+        if r not in nuevo.patrones or r in a_dibujar:
+            borrar.extend(archivos)
+        elif info.get("linea") != nuevo.patrones[r].get("linea"):
+            mover.extend(zip(archivos, nuevo.patrones[r]["archivos"]))
+    nuevo.borrar(borrar)
+    nuevo.mover(mover)
+
+
+def procesar_archivo(nombre_archivo: str, incremental: bool = True):
+    """
+    Procesa un archivo caso por caso:
       - Construye árbol sintáctico
       - Construye AFN
       - Construye AFD por subconjuntos
       - Minimiza el AFD
       - Genera imágenes en src/results/
       - Simula la cadena w en AFN, AFD y AFDmin
+    Cada regex distinta se compila (en paralelo) y se dibuja una sola vez,
+    aunque aparezca en muchas líneas; la salida conserva el orden del archivo.
+
+    Con incremental=True se usa el manifiesto de la ejecución anterior
+    (ver utils.manifiesto): solo se compilan los patrones con líneas
+    nuevas o modificadas y solo se dibujan los que no tienen imágenes.
     """
     with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
         lineas = archivo.readlines()
 
-    for i, linea in enumerate(lineas):
-        original = linea.strip()
-        if not original:
-            continue
-
-        try:
-            r, w_raw = parsear_linea(original)
-            if r is None:
-                continue
-            w_literal = interpretar_cadena_literal(w_raw)
-
-            print(f"\n=== Procesando línea {i+1} ===")
-            print("Original:", r)
-            print("Cadena w:", repr(w_literal))
-
-            # 1) expandir clases y operadores
-            clase_expandida = expandir_clases(r)
-            expandida = expandir_operadores(clase_expandida)
-            print("Expandida (operadores):", expandida)
+    avisos = []
+    casos = leer_casos(lineas, avisos)
+    for n, mensaje in avisos:
+        print(f"Advertencia en línea #{n}: {mensaje}")
+    anterior = Manifiesto.cargar(RESULTS_DIR) if incremental else Manifiesto(RESULTS_DIR)
+    nuevo = Manifiesto(RESULTS_DIR)
 
-            # 2) tokenizar regex
-            tokens = tokenize(expandida)
-            print("Tokens:", tokens)
+    primeras = {}  # regex -> primera línea donde aparece
+    for n, r, _ in casos:
+        primeras.setdefault(r, n)
 
-            # 3) insertar concatenaciones explícitas
-            tokens_con_concat = insertar_concatenaciones_tokens(tokens)
-            print("Tokens con concat.:", tokens_con_concat)
+    a_compilar, a_dibujar = _planificar(anterior, primeras, casos)
+    patrones = compilar_patrones(r for r in primeras if r in a_compilar)
 
-            # 4) pasar al shunting yard
-            postfijo = shunting_yard(tokens_con_concat)
-            print("Postfija:", ' '.join(postfijo))
+    for r, k in primeras.items():
+        patron = patrones.get(r)
+        if isinstance(patron, Exception):
+            nuevo.patrones[r] = {"error": str(patron)}
+        elif r in a_dibujar:
+            nuevo.patrones[r] = {"linea": k, "resumen": _resumen(patron), "afd": patron.tiene_afd,
+                                 "archivos": archivos_patron(k, patron.tiene_afd)}
+        else:
+            info = dict(anterior.patrones[r])
+            if "error" not in info:
+                info["archivos"] = archivos_patron(k, info["afd"])
+                info["linea"] = k
+            nuevo.patrones[r] = info
+    _actualizar_artefactos(anterior, nuevo, a_dibujar)
 
-            # 5) construir árbol sintáctico
-            raiz = construir_arbol(postfijo)
-            dibujar_arbol(raiz, f"arbol_expr_{i+1}")
+    dibujados = {}  # regex -> línea donde se mostró y dibujó
 
-            # 6) construir AFN
-            State._next_id = 0  # reset ids de estados
-            afn = construir_afn_desde_arbol(raiz)
-            dibujar_afn(afn, f"afn_expr_{i+1}")
+    for n, r, w_raw in casos:
+        try:
+            w_literal = interpretar_cadena_literal(w_raw)
 
-            # 7) construir AFD
-            start_dfa, dfa_states = construir_afd_desde_afn(afn)
-            dibujar_afd(start_dfa, dfa_states, f"afd_expr_{i+1}")
+            print(f"\n=== Procesando línea {n} ===")
+            print("Original:", r)
+            print("Cadena w:", repr(w_literal))
 
-            # 8) minimizar AFD
-            start_min, min_states = minimizar_afd(start_dfa, dfa_states)
-            dibujar_afd_min(start_min, min_states, f"afd_min_expr_{i+1}")
+            info = nuevo.patrones[r]
+            if r in dibujados:
+                print(f"Patrón ya compilado en la línea {dibujados[r]}")
+            if "error" in info:
+                raise ValueError(info["error"])
+            primera = r not in dibujados
+            if primera:
+                for linea in info["resumen"]:
+                    print(linea)
 
-            # 9) procesar cadena w como lista de caracteres
+            # procesar cadena w como lista de tokens
             tokens_w = tokenizar_cadena(w_literal) if w_literal else []
             print("Tokens w:", tokens_w)
 
-            # 10) simulación
-            ok_afn = acepta(afn, tokens_w)
-            ok_afd = acepta_afd(start_dfa, tokens_w)
-            ok_min = acepta_afd(start_min, tokens_w)
+            # simulación (o los veredictos guardados si la línea no cambió)
+            h = hash_caso(r, w_raw)
+            veredictos = anterior.casos.get(h)
+            if veredictos is None:
+                veredictos = list(patrones[r].evaluar(tokens_w))
+            nuevo.casos[h] = veredictos
+            ok_afn, ok_afd, ok_min = veredictos
+
+            # el patrón queda como dibujado solo si las imágenes se generaron;
+            # si falla, el veredicto se muestra igual y la próxima línea reintenta
+            dibujo_ok = True
+            if primera:
+                try:
+                    if r in a_dibujar:
+                        _dibujar(patrones[r], n)
+                        info["linea"] = n
+                        info["archivos"] = archivos_patron(n, info["afd"])
+                    dibujados[r] = info["linea"]
+                except Exception as e:
+                    dibujo_ok = False
+                    nuevo.borrar(archivos_patron(n, info["afd"]))  # imágenes a medias
+                    print(f"Error al dibujar línea #{n}: {e}")
 
-            print(f"Árbol: src/results/arbol_expr_{i+1}.png")
-            print(f"AFN : src/results/afn_expr_{i+1}.png")
-            print(f"AFD : src/results/afd_expr_{i+1}.png")
-            print(f"AFDmin: src/results/afd_min_expr_{i+1}.png")
+            if dibujo_ok:
+                k = dibujados[r]
+                print(f"Árbol: src/results/arbol_expr_{k}.png")
+                print(f"AFN : src/results/afn_expr_{k}.png")
+                if info["afd"]:
+                    print(f"AFD : src/results/afd_expr_{k}.png")
+                    print(f"AFDmin: src/results/afd_min_expr_{k}.png")
             print("Resultado AFN   :", "sí" if ok_afn else "no")
-            print("Resultado AFD   :", "sí" if ok_afd else "no")
-            print("Resultado AFDmin:", "sí" if ok_min else "no")
+            print("Resultado AFD   :", _resultado(ok_afd))
+            print("Resultado AFDmin:", _resultado(ok_min))
             print()
 
         except Exception as e:
-            print(f"Error en línea #{i+1}: {e}")
+            print(f"Error en línea #{n}: {e}")
+
+    nuevo.guardar()
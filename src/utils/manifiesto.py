@@ -0,0 +1,103 @@
+"""
+Módulo manifiesto: registro de lo que produjo la última ejecución de
+procesar_archivo, guardado junto a las imágenes (results/manifest.json).
+- por patrón: primera línea k, imágenes generadas y lo que se mostró
+  (postfija y verificación) o el error de compilación
+- por caso: hash de (versión, regex, cadena) -> veredictos
+Con él una nueva ejecución reutiliza las imágenes y los resultados de las
+líneas sin cambios, renombra las imágenes de los patrones que cambiaron
+de línea y borra las de los patrones que ya no están.
+"""
+
+import hashlib
+import json
+import os
+
+NOMBRE = "manifest.json"
+
+# cambiarla invalida todo lo guardado (por ejemplo, si cambia la salida)
+VERSION_PIPELINE = 4
+
+
+def hash_caso(r: str, w_raw: str) -> str:
+    """
+    Hash de una línea: regex, cadena sin interpretar y versión.
+    """
+    contenido = f"{VERSION_PIPELINE}\0{r}\0{w_raw}"
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def archivos_patron(k: int, afd: bool) -> list[str]:
+    """
+    Imágenes que genera el patrón cuya primera línea es k.
+    """
+    nombres = [f"arbol_expr_{k}.png", f"afn_expr_{k}.png"]
+    if afd:
+        nombres += [f"afd_expr_{k}.png", f"afd_min_expr_{k}.png"]
+    return nombres
+
+
+class Manifiesto:
+    def __init__(self, directorio: str, patrones=None, casos=None):
+        self.directorio = directorio
+        self.patrones = patrones if patrones is not None else {}  # regex -> info
+        self.casos = casos if casos is not None else {}           # hash -> veredictos
+
+    @classmethod
+    def cargar(cls, directorio: str):
+        """
+        Manifiesto guardado en directorio; uno vacío si no existe, está
+        dañado o es de otra versión.
+        """
+        try:
+            with open(os.path.join(directorio, NOMBRE), encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return cls(directorio)
+        if not isinstance(datos, dict) or datos.get("version") != VERSION_PIPELINE:
+            return cls(directorio)
+        return cls(directorio, datos.get("patrones", {}), datos.get("casos", {}))
+
+    def guardar(self):
+        """
+        Escribe el manifiesto (a un temporal y luego lo reemplaza, para
+        no dejar uno a medio escribir).
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = os.path.join(self.directorio, NOMBRE)
+        datos = {"version": VERSION_PIPELINE, "patrones": self.patrones, "casos": self.casos}
+        with open(ruta + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+        os.replace(ruta + '.tmp', ruta)
+
+    def artefactos_presentes(self, info) -> bool:
+        """
+        True si el patrón no necesita dibujarse: falló al compilar o
+        todas sus imágenes siguen en el directorio.
+        """
+        return "error" in info or all(
+            os.path.exists(os.path.join(self.directorio, a)) for a in info["archivos"])
+
+    def borrar(self, nombres):
+        for nombre in nombres:
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except FileNotFoundError:
+                pass
+
+    def mover(self, movimientos):
+        """
+        Renombra imágenes según movimientos [(viejo, nuevo)]. Se pasa por
+        nombres temporales porque un nombre nuevo puede ser el viejo de
+        otro patrón (al insertar una línea todos se corren uno).
+        """
+        temporales = []
+        for i, (viejo, nuevo) in enumerate(movimientos):
+            tmp = f".mover_{i}_{viejo}"
+            os.replace(os.path.join(self.directorio, viejo), os.path.join(self.directorio, tmp))
+            temporales.append((tmp, nuevo))
+        for tmp, nuevo in temporales:
+            os.replace(os.path.join(self.directorio, tmp), os.path.join(self.directorio, nuevo))
+
+
+__all__ = ["Manifiesto", "hash_caso", "archivos_patron", "VERSION_PIPELINE"]